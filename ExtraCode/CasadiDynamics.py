@@ -0,0 +1,126 @@
+# Import libraries
+import casadi as ca
+
+# DATA (OSS: adimensional constants, computed once)
+m_star = 6.0458 * 1e24  # Kilograms
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+mu = 0.012150583925359
+Isp = 310.0 / t_star
+g0 = 9.81 / (l_star / t_star**2)
+Tmax = 29620 / (m_star * l_star / t_star**2)
+n_states = 13
+n_controls = 4  # OSS: thrust direction and throttle, as in the OCP
+
+# Built functions, one per options set
+_functions = {}
+
+
+def jit_options(compiler="shell", flags=("-O3",)):
+    """
+    Options to JIT-compile a CasADi Function or NLP solver to C
+    :param compiler: CasADi compiler plugin
+    :param flags: Compiler flags
+    :return: Dictionary of options
+    """
+    return {
+        "jit": True,
+        "compiler": compiler,
+        "jit_options": {"flags": list(flags), "verbose": False},
+    }
+
+
+def gravity(r):
+    # Gravitational acceleration of Earth and Moon at a position of the rotating frame
+    r1 = r + ca.vertcat(mu, 0, 0)
+    r2 = r + ca.vertcat(mu - 1, 0, 0)
+    return -(1 - mu) * r1 / ca.norm_2(r1) ** 3 - mu * r2 / ca.norm_2(r2) ** 3
+
+
+def rel_crtbp_thrust_expr(x, thrust, eps=0.0):
+    """
+    Relative CRTBP dynamics with a thrust vector
+    :param x: State (target, relative, mass), 13
+    :param thrust: Thrust vector, adimensional, 3
+    :param eps: Smoothing of the thrust norm in the mass flow (OSS: for the MPC)
+    :return: State derivative, 13
+    """
+    rt, vt = x[0:3], x[3:6]
+    rho, vr = x[6:9], x[9:12]
+    m = x[12]
+
+    at = ca.vertcat(2 * vt[1] + rt[0], -2 * vt[0] + rt[1], 0) + gravity(rt)
+    ar = (
+        ca.vertcat(2 * vr[1] + rho[0], -2 * vr[0] + rho[1], 0)
+        + gravity(rt + rho)
+        - gravity(rt)
+        + thrust / m
+    )
+    mdot = -ca.sqrt(ca.sumsqr(thrust) + eps**2) / (Isp * g0)
+
+    return ca.vertcat(vt, at, vr, ar, mdot)
+
+
+def rel_crtbp_expr(x, u):
+    """
+    Relative CRTBP dynamics with thrust, same equations of OCP.py
+    :param x: State (target, relative, mass), 13
+    :param u: Controls (thrust direction, throttle), 4
+    :return: State derivative, 13
+    """
+    thrust = Tmax * u[3] * u[0:3] / ca.norm_2(u[0:3])
+    xdot = rel_crtbp_thrust_expr(x, thrust)
+    return ca.vertcat(xdot[0:12], -Tmax * u[3] / (Isp * g0))  # OSS: throttle-based mass flow
+
+
+def rel_crtbp_function(jit=False):
+    """
+    Relative CRTBP dynamics as a CasADi Function, built once per process
+    :param jit: True to JIT-compile it (C compiler needed)
+    :return: Function f(x, u) -> xdot
+    """
+    if jit not in _functions:
+        x = ca.SX.sym("x", n_states)
+        u = ca.SX.sym("u", n_controls)
+        opts = jit_options() if jit else {}
+        _functions[jit] = ca.Function(
+            "rel_crtbp", [x, u], [rel_crtbp_expr(x, u)], ["x", "u"], ["xdot"], opts
+        )
+    return _functions[jit]
+
+
+def rel_crtbp_thrust_function(eps=1e-6 * Tmax, jit=False):
+    """
+    Relative CRTBP dynamics with a thrust vector as a CasADi Function, built
+    once per process
+    :param eps: Smoothing of the thrust norm in the mass flow, adimensional
+        (OSS: small w.r.t. Tmax, not to one)
+    :param jit: True to JIT-compile it (C compiler needed)
+    :return: Function f(x, T) -> xdot
+    """
+    if ("thrust", eps, jit) not in _functions:
+        x = ca.SX.sym("x", n_states)
+        thrust = ca.SX.sym("T", 3)
+        opts = jit_options() if jit else {}
+        _functions[("thrust", eps, jit)] = ca.Function(
+            "rel_crtbp_thrust",
+            [x, thrust],
+            [rel_crtbp_thrust_expr(x, thrust, eps)],
+            ["x", "T"],
+            ["xdot"],
+            opts,
+        )
+    return _functions[("thrust", eps, jit)]
+
+
+def dynamics(x, u, t):
+    """
+    Dynamics callback of mpopt, from the CasADi Function
+    (OSS: symbolic calls inline the simplified expression graph)
+    """
+    f = rel_crtbp_function()
+    xdot = f(
+        ca.vertcat(*[x[i] for i in range(n_states)]),
+        ca.vertcat(*[u[i] for i in range(n_controls)]),
+    )
+    return [xdot[i] for i in range(n_states)]
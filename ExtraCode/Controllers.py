@@ -0,0 +1,215 @@
+# Import libraries
+import numpy as np
+import control as ct
+import scipy.optimize
+
+# OSS: controllers share the SB3 predict interface, so that the Monte Carlo
+# engine runs them as the learned policies
+
+
+def rel_crtbp(x):
+    """
+                Circular Restricted Three-Body Problem Dynamics
+    :
+                :param x: State, vector 12x1
+                :return: State Derivative, vector 6x1
+    """
+
+    # Initialize ODE
+    dxdt = np.zeros((12,))
+    mu = 0.012150583925359
+    # Initialize Target State
+    xt = x[0]
+    yt = x[1]
+    zt = x[2]
+    xtdot = x[3]
+    ytdot = x[4]
+    ztdot = x[5]
+    # Initialize Relative State
+    xr = x[6]
+    yr = x[7]
+    zr = x[8]
+    xrdot = x[9]
+    yrdot = x[10]
+    zrdot = x[11]
+
+    # Relative CRTBP Dynamics
+    r1t = [xt + mu, yt, zt]
+    r2t = [xt + mu - 1, yt, zt]
+    r1t_norm = np.sqrt((xt + mu) ** 2 + yt**2 + zt**2)
+    r2t_norm = np.sqrt((xt + mu - 1) ** 2 + yt**2 + zt**2)
+    rho = [xr, yr, zr]
+
+    # Target Equations
+    dxdt[0:3] = [xtdot, ytdot, ztdot]
+    dxdt[3:6] = [
+        2 * ytdot
+        + xt
+        - (1 - mu) * (xt + mu) / r1t_norm**3
+        - mu * (xt + mu - 1) / r2t_norm**3,
+        -2 * xtdot + yt - (1 - mu) * yt / r1t_norm**3 - mu * yt / r2t_norm**3,
+        -(1 - mu) * zt / r1t_norm**3 - mu * zt / r2t_norm**3,
+    ]
+
+    # Chaser equations
+    dxdt[6:9] = [xrdot, yrdot, zrdot]
+    dxdt[9:12] = [
+        2 * yrdot
+        + xr
+        + (1 - mu)
+        * (
+            (xt + mu) / r1t_norm**3
+            - (xt + xr + mu) / np.linalg.norm(np.add(r1t, rho)) ** 3
+        )
+        + mu
+        * (
+            (xt + mu - 1) / r2t_norm**3
+            - (xt + xr + mu - 1) / np.linalg.norm(np.add(r2t, rho)) ** 3
+        ),
+        -2 * xrdot
+        + yr
+        + (1 - mu)
+        * (yt / r1t_norm**3 - (yt + yr) / np.linalg.norm(np.add(r1t, rho)) ** 3)
+        + mu * (yt / r2t_norm**3 - (yt + yr) / np.linalg.norm(np.add(r2t, rho)) ** 3),
+        (1 - mu)
+        * (zt / r1t_norm**3 - (zt + zr) / np.linalg.norm(np.add(r1t, rho)) ** 3)
+        + mu * (zt / r2t_norm**3 - (zt + zr) / np.linalg.norm(np.add(r2t, rho)) ** 3),
+    ]
+
+    return dxdt
+
+
+def lqr_gain(x0, Q=None, R=None):
+    """
+    LQR gain of the relative dynamics linearized at a state (as in LQR.py)
+    :param x0: Target and relative state, adimensional, 12
+    :param Q: State weight, identity if None
+    :param R: Control weight, identity if None
+    :return: Gain, 3 x 6
+    """
+    A = scipy.optimize.approx_fprime(np.asarray(x0, dtype=float), rel_crtbp)
+    A = A[6:12, 6:12]
+    B = np.array(([0, 0, 0], [0, 0, 0], [0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]))
+    Q = np.eye(6) if Q is None else Q
+    R = np.eye(3) if R is None else R
+    K, S, E = ct.lqr(A, B, Q, R)
+
+    return np.asarray(K)
+
+
+def thrust_to_action(env, thrust):
+    """
+    Inverse of scaler_reverse_action, saturated on the action box
+    (OSS: the direction of the thrust is kept)
+    :param env: Environment
+    :param thrust: Thrust vector, adimensional, 3 or n x 3
+    :return: Action, same shape
+    """
+    action = np.asarray(thrust) * np.linalg.norm(np.array([1, 1, 1])) / env.max_thrust
+    peak = np.max(np.abs(action), axis=-1, keepdims=True)
+    action = action / np.maximum(peak, 1)
+    return action.astype(np.float32)
+
+
+class LqrController:
+    """
+    LQR on the relative state, T = - max_thrust * gain * K x (as in LQR.py).
+    Observations can be batched, n x 16, for lockstep campaigns.
+
+    :param env: Environment, for scalers and thrust bound
+    :param x0: Linearization state, mean initial state of the environment if None
+    :param Q: State weight
+    :param R: Control weight
+    :param gain: Thrust gain
+    """
+
+    def __init__(self, env, x0=None, Q=None, R=None, gain=1e3):
+        self.env = env
+        x0 = env.state0[0:12] if x0 is None else x0
+        self.K = lqr_gain(x0, Q, R)
+        self.gain = gain
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        x = self.env.scaler_reverse_observation(np.asarray(obs))
+        thrust = -self.env.max_thrust * self.gain * x[..., 6:12] @ self.K.T
+        return thrust_to_action(self.env, thrust), None
+
+
+class OcpController:
+    """
+    Open-loop OCP guidance: the OCP of OcpProblem is solved from the state at
+    the start of every episode and its thrust profile is replayed, zero thrust
+    after the optimal time of flight or if the solution has not converged.
+
+    :param env: Environment, for scalers and thrust bound
+    :param ocp_kwargs: Arguments of build_ocp (tof_bounds, ang_corr...)
+    :param solve_kwargs: Arguments of solve_ocp (n_segments, poly_orders...)
+    :param cache: OcpCache for exact hits and warm starts, None to solve cold
+        (OSS: new solutions are kept in new_solutions, to be merged and saved by
+        the parent process with OcpCache.merge)
+    """
+
+    def __init__(self, env, ocp_kwargs=None, solve_kwargs=None, cache=None):
+        self.env = env
+        self.ocp_kwargs = {} if ocp_kwargs is None else ocp_kwargs
+        self.solve_kwargs = {} if solve_kwargs is None else solve_kwargs
+        self.cache = cache
+        self.sol = None
+        self.thrust = None
+        self.new_solutions = []  # OSS: (solution, ocp_kwargs, solve_kwargs)
+
+    def solve(self, x00):
+        from OcpProblem import build_ocp, solve_ocp, thrust_profile
+
+        warm = None
+        if self.cache is not None:
+            hits = self.cache.nearest(x00, self.ocp_kwargs, self.solve_kwargs)
+            if hits and hits[0][0] <= self.cache.tol:
+                self.sol = hits[0][1]
+                self.thrust = thrust_profile(self.sol)
+                return self.sol
+            warm = hits[0][1] if hits else None
+        try:
+            self.sol = solve_ocp(
+                build_ocp(x00, **self.ocp_kwargs), warm=warm, **self.solve_kwargs
+            )
+        except RuntimeError as error:  # OSS: failed NLP, e.g. restoration failure
+            print("OCP failed: %s" % error)
+            self.sol = {"converged": False, "x00": np.asarray(x00, dtype=float)}
+            self.thrust = None
+            return self.sol
+        self.sol["x00"] = np.asarray(x00, dtype=float)
+        if self.cache is not None and self.sol["converged"]:
+            self.cache.put(self.sol, self.ocp_kwargs, self.solve_kwargs)
+            sol = {
+                name: value
+                for name, value in self.sol.items()
+                if name not in ("mpo", "post")
+            }
+            self.new_solutions.append(
+                (sol, dict(self.ocp_kwargs), dict(self.solve_kwargs))
+            )
+        self.thrust = thrust_profile(self.sol)
+        return self.sol
+
+    def pop_new_solutions(self):
+        # Solutions found since the last call, for the cache of the parent process
+        new, self.new_solutions = self.new_solutions, []
+        return new
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        x = self.env.scaler_reverse_observation(obs)
+        if episode_start is None or np.any(episode_start):
+            self.solve(x[0:13])
+        if not self.sol["converged"]:
+            return np.zeros(3, dtype=np.float32), None
+
+        # Thrust at the middle of the step (OSS: held constant by the environment)
+        elapsed = (self.env.max_time - x[13] + self.env.dt / 2) * self.env.t_star
+        if elapsed > self.sol["tof"]:
+            return np.zeros(3, dtype=np.float32), None
+        thrust = np.array(
+            [np.interp(elapsed, self.sol["t"], self.thrust[:, i]) for i in range(3)]
+        )
+
+        return thrust_to_action(self.env, thrust), None
@@ -0,0 +1,178 @@
+# Import libraries
+import numpy as np
+import scipy.linalg
+from scipy.integrate import solve_ivp
+from Controllers import thrust_to_action
+
+# DATA
+mu = 0.012150583925359
+B = np.vstack((np.zeros((3, 3)), np.eye(3)))
+
+
+def crtbp(t, x):
+    # Target dynamics in the CRTBP, adimensional
+    r1 = np.array([x[0] + mu, x[1], x[2]])
+    r2 = np.array([x[0] + mu - 1, x[1], x[2]])
+    acc = (
+        np.array([2 * x[4] + x[0], -2 * x[3] + x[1], 0])
+        - (1 - mu) * r1 / np.linalg.norm(r1) ** 3
+        - mu * r2 / np.linalg.norm(r2) ** 3
+    )
+    return np.concatenate((x[3:6], acc))
+
+
+def rel_jacobian(xt):
+    """
+    Relative dynamics linearized at the target, analytic (OSS: same A of LQR.py)
+    :param xt: Target state, adimensional, 6
+    :return: A, 6 x 6
+    """
+    G = np.diag([1.0, 1.0, 0.0])
+    for m, offset in [(1 - mu, mu), (mu, mu - 1)]:
+        r = np.array([xt[0] + offset, xt[1], xt[2]])
+        d = np.linalg.norm(r)
+        G += m * (3 * np.outer(r, r) / d**5 - np.eye(3) / d**3)
+    C = np.array([[0, 2, 0], [-2, 0, 0], [0, 0, 0]])
+    return np.block([[np.zeros((3, 3)), np.eye(3)], [G, C]])
+
+
+def orbit_period(x0t, t_max=5.0):
+    """
+    Period of the target orbit, from its next crossing of the y = 0 plane in
+    the same direction (OSS: x0t on the x-z plane, as the NRO of the scenario)
+    :param x0t: Target state, adimensional, 6
+    :param t_max: Maximum propagation time, adimensional
+    :return: Period, adimensional
+    """
+
+    def crossing(t, x):
+        return x[1]
+
+    crossing.direction = np.sign(x0t[4])
+    sol = solve_ivp(
+        fun=crtbp,
+        t_span=(0, t_max),
+        y0=x0t,
+        events=crossing,
+        method="LSODA",
+        rtol=2.220446049250313e-14,
+        atol=2.220446049250313e-14,
+    )
+    t_events = sol.t_events[0][sol.t_events[0] > 1e-3]  # OSS: skip the initial one
+    return t_events[0]
+
+
+def periodic_riccati(x0t, Q=None, R=None, n_nodes=360, max_periods=20, tol=1e-8):
+    """
+    Periodic LQR along the target orbit: the Riccati equation is integrated
+    backward over whole periods until P at the initial phase converges, and
+    the gains of the last period are tabulated by orbital phase
+    :param x0t: Target state at phase zero, adimensional, 6
+    :param Q: State weight, identity if None
+    :param R: Control weight, identity if None
+    :param n_nodes: Number of phases of the table
+    :param max_periods: Maximum number of backward periods
+    :param tol: Relative tolerance on the periodic P
+    :return: Dictionary with period, phase, target states, gains and Riccati solutions
+    """
+    Q = np.eye(6) if Q is None else Q
+    R = np.eye(3) if R is None else R
+    R_inv = np.linalg.inv(R)
+
+    # Target orbit over one period
+    period = orbit_period(x0t)
+    phase = np.arange(n_nodes) / n_nodes
+    orbit = solve_ivp(
+        fun=crtbp,
+        t_span=(0, period),
+        y0=x0t,
+        dense_output=True,
+        method="LSODA",
+        rtol=2.220446049250313e-14,
+        atol=2.220446049250313e-14,
+    )
+
+    def riccati(t, p):
+        P = p.reshape(6, 6)
+        A = rel_jacobian(orbit.sol(t % period))
+        dP = -(A.T @ P + P @ A - P @ B @ R_inv @ B.T @ P + Q)
+        return dP.flatten()
+
+    # Backward sweeps from the constant-gain solution at phase zero
+    P = scipy.linalg.solve_continuous_are(rel_jacobian(x0t), B, Q, R)
+    for _ in range(max_periods):
+        sol = solve_ivp(
+            fun=riccati,
+            t_span=(period, 0),
+            y0=P.flatten(),
+            t_eval=phase[::-1] * period,
+            method="LSODA",
+            rtol=1e-10,
+            atol=1e-12,
+        )
+        P_new = sol.y[:, -1].reshape(6, 6)
+        converged = np.linalg.norm(P_new - P) <= tol * np.linalg.norm(P)
+        P = (P_new + P_new.T) / 2
+        if converged:
+            break
+
+    # Table (OSS: t_eval is decreasing)
+    P_table = sol.y.T[::-1].reshape(-1, 6, 6)
+    K_table = np.array([R_inv @ B.T @ P_k for P_k in P_table])
+
+    return {
+        "period": period,
+        "phase": phase,
+        "xt": orbit.sol(phase * period).T,
+        "K": K_table,
+        "P": P_table,
+        "converged": converged,
+    }
+
+
+def save_schedule(path, schedule):
+    np.savez(path, **{key: np.asarray(value) for key, value in schedule.items()})
+
+
+def load_schedule(path):
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+class ScheduledLqrController:
+    """
+    Time-varying LQR, same thrust law of LqrController: the gain is
+    interpolated in the periodic table at the orbital phase of the target,
+    found at the start of the episode from the nearest tabulated target
+    position and then advanced with time.
+
+    :param env: Environment, for scalers and thrust bound
+    :param schedule: Dictionary returned by periodic_riccati or load_schedule
+    :param gain: Thrust gain
+    """
+
+    def __init__(self, env, schedule, gain=1e3):
+        self.env = env
+        self.schedule = schedule
+        self.gain = gain
+        self.K_table = np.asarray(schedule["K"])
+        self.n_nodes = len(self.K_table)
+        self.period = float(schedule["period"])
+        self.phase0 = 0.0
+
+    def gain_at(self, phase):
+        # O(1) linear interpolation in the periodic table
+        s = (phase % 1.0) * self.n_nodes
+        i = int(s) % self.n_nodes
+        w = s - np.floor(s)
+        return (1 - w) * self.K_table[i] + w * self.K_table[(i + 1) % self.n_nodes]
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        x = self.env.scaler_reverse_observation(obs)
+        if episode_start is None or np.any(episode_start):
+            dist = np.linalg.norm(self.schedule["xt"][:, 0:3] - x[0:3], axis=1)
+            self.phase0 = self.schedule["phase"][int(np.argmin(dist))]
+        elapsed = self.env.max_time - x[13]
+        K = self.gain_at(self.phase0 + elapsed / self.period)
+        thrust = -self.env.max_thrust * self.gain * K @ x[6:12]
+        return thrust_to_action(self.env, thrust), None
@@ -3,82 +3,10 @@ import control as ct
 import scipy.optimize
 from scipy.integrate import solve_ivp
 import matplotlib.pyplot as plt
+from Controllers import rel_crtbp
 
 
 # Functions
-# Functions needed
-def rel_crtbp(x):
-    """
-                Circular Restricted Three-Body Problem Dynamics
-    :
-                :param x: State, vector 12x1
-                :return: State Derivative, vector 6x1
-    """
-
-    # Initialize ODE
-    dxdt = np.zeros((12,))
-    mu = 0.012150583925359
-    # Initialize Target State
-    xt = x[0]
-    yt = x[1]
-    zt = x[2]
-    xtdot = x[3]
-    ytdot = x[4]
-    ztdot = x[5]
-    # Initialize Relative State
-    xr = x[6]
-    yr = x[7]
-    zr = x[8]
-    xrdot = x[9]
-    yrdot = x[10]
-    zrdot = x[11]
-
-    # Relative CRTBP Dynamics
-    r1t = [xt + mu, yt, zt]
-    r2t = [xt + mu - 1, yt, zt]
-    r1t_norm = np.sqrt((xt + mu) ** 2 + yt**2 + zt**2)
-    r2t_norm = np.sqrt((xt + mu - 1) ** 2 + yt**2 + zt**2)
-    rho = [xr, yr, zr]
-
-    # Target Equations
-    dxdt[0:3] = [xtdot, ytdot, ztdot]
-    dxdt[3:6] = [
-        2 * ytdot
-        + xt
-        - (1 - mu) * (xt + mu) / r1t_norm**3
-        - mu * (xt + mu - 1) / r2t_norm**3,
-        -2 * xtdot + yt - (1 - mu) * yt / r1t_norm**3 - mu * yt / r2t_norm**3,
-        -(1 - mu) * zt / r1t_norm**3 - mu * zt / r2t_norm**3,
-    ]
-
-    # Chaser equations
-    dxdt[6:9] = [xrdot, yrdot, zrdot]
-    dxdt[9:12] = [
-        2 * yrdot
-        + xr
-        + (1 - mu)
-        * (
-            (xt + mu) / r1t_norm**3
-            - (xt + xr + mu) / np.linalg.norm(np.add(r1t, rho)) ** 3
-        )
-        + mu
-        * (
-            (xt + mu - 1) / r2t_norm**3
-            - (xt + xr + mu - 1) / np.linalg.norm(np.add(r2t, rho)) ** 3
-        ),
-        -2 * xrdot
-        + yr
-        + (1 - mu)
-        * (yt / r1t_norm**3 - (yt + yr) / np.linalg.norm(np.add(r1t, rho)) ** 3)
-        + mu * (yt / r2t_norm**3 - (yt + yr) / np.linalg.norm(np.add(r2t, rho)) ** 3),
-        (1 - mu)
-        * (zt / r1t_norm**3 - (zt + zr) / np.linalg.norm(np.add(r1t, rho)) ** 3)
-        + mu * (zt / r2t_norm**3 - (zt + zr) / np.linalg.norm(np.add(r2t, rho)) ** 3)
-    ]
-
-    return dxdt
-
-
 def rel_crtbpT(
         t,
         x,
@@ -0,0 +1,43 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from Controllers import lqr_gain
+from GainSchedule import periodic_riccati, save_schedule
+
+# Target state at phase zero (9:2 NRO, as LQR.py)
+x0_target = np.array(
+    [
+        1.02206694e00,
+        -1.32282592e-07,
+        -1.82100000e-01,
+        -1.69229909e-07,
+        -1.03353155e-01,
+        6.44013821e-07,
+    ]
+)
+t_star = 375200  # Seconds
+
+# Periodic Riccati along the NRO
+schedule = periodic_riccati(x0_target, Q=np.eye(6), R=np.eye(3), n_nodes=360)
+save_schedule("lqr_schedule.npz", schedule)
+print("Period: %.3f days" % (schedule["period"] * t_star / 86400))
+print("Converged:", schedule["converged"])
+
+# Constant gain of LQR.py for comparison
+K0 = lqr_gain(np.concatenate((x0_target, np.zeros(6))))
+
+# Plot
+plt.figure()
+plt.plot(
+    schedule["phase"],
+    np.linalg.norm(schedule["K"], axis=(1, 2)),
+    c="b",
+    linewidth=2,
+    label="Periodic",
+)
+plt.axhline(np.linalg.norm(K0), c="r", linestyle="dashed", linewidth=2, label="Constant")
+plt.grid(True)
+plt.xlabel("Orbital phase [-]")
+plt.ylabel("$||K||_2$ [-]")
+plt.legend()
+plt.savefig(".\LQR_Schedule.pdf")
+plt.show()
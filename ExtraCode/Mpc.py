@@ -0,0 +1,166 @@
+# Import libraries
+import time
+import numpy as np
+import casadi as ca
+from CasadiDynamics import Isp, Tmax, g0, jit_options, rel_crtbp_thrust_function
+from Controllers import thrust_to_action
+
+# DATA
+m_star = 6.0458 * 1e24  # Kilograms
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+mass = 21000
+
+
+class MpcController:
+    """
+    Receding-horizon MPC: a short-horizon OCP with multiple shooting (RK4 on
+    the CasADi dynamics, one interval per environment step) is re-solved every
+    k steps from the observed state, warm-started from the shifted previous
+    solution. The thrust of every component is bounded as the action box of
+    the environment, and the failed thruster is unknown to the controller.
+
+    :param env: Environment, for scalers, time step and thrust bound
+    :param horizon: Number of steps of the horizon
+    :param k: Steps between two solves
+    :param q: Weight of the relative state, in units of scale_pos and scale_vel
+    :param q_f: Weight of the terminal relative state
+    :param r: Weight of the thrust, in units of the per-component bound
+    :param corridor: True to impose the approach corridor
+    :param scale_pos: Scale of the relative position [m]
+    :param scale_vel: Scale of the relative velocity [m/s]
+    :param n_sub: RK4 sub-steps per interval
+    :param jit: True to JIT-compile the NLP (C compiler needed)
+    """
+
+    def __init__(
+        self,
+        env,
+        horizon=20,
+        k=1,
+        q=1.0,
+        q_f=10.0,
+        r=1.0,
+        corridor=True,
+        scale_pos=50,
+        scale_vel=0.5,
+        n_sub=1,
+        jit=False,
+    ):
+        self.env = env
+        self.horizon = horizon
+        self.k = min(k, horizon)
+        self.latency = []  # OSS: wall time of every solve [s]
+        self.iterations = []
+        self._plan = None
+        self._steps = 0
+        self._solved = 0
+        self._guess = None
+
+        # Scaling of the NLP variables (OSS: adimensional values are tiny)
+        self.S = np.concatenate(
+            (
+                np.ones(6),
+                scale_pos / l_star * np.ones(3),
+                scale_vel / (l_star / t_star) * np.ones(3),
+                [mass / m_star],
+            )
+        )
+        t_bound = 1 / np.sqrt(3)  # OSS: per-component bound of the action box
+
+        # Discretized dynamics
+        f = rel_crtbp_thrust_function()
+        x = ca.MX.sym("x", 13)
+        T = ca.MX.sym("T", 3)
+        h = env.dt / n_sub
+        xk = x
+        for _ in range(n_sub):
+            k1 = f(xk, T)
+            k2 = f(xk + h / 2 * k1, T)
+            k3 = f(xk + h / 2 * k2, T)
+            k4 = f(xk + h * k3, T)
+            xk = xk + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        F = ca.Function("F", [x, T], [xk])
+
+        # Check of the mass flow: one step at full thrust from the nominal state
+        x_nom = np.asarray(env.state0[0:13], dtype=float)
+        dm = x_nom[12] - float(F(x_nom, Tmax * t_bound * np.ones(3))[12])
+        if not 0 <= dm <= Tmax * env.dt / (Isp * g0) * (1 + 1e-6):
+            raise ValueError("Inconsistent mass flow of the MPC model: %e" % dm)
+
+        # Problem
+        opti = ca.Opti()
+        Xs = opti.variable(13, horizon + 1)
+        Us = opti.variable(3, horizon)
+        x0 = opti.parameter(13)
+        S = ca.DM(self.S)
+        opti.subject_to(Xs[:, 0] == x0 / S)
+        cost = 0
+        for i in range(horizon):
+            opti.subject_to(F(Xs[:, i] * S, Tmax * Us[:, i]) / S == Xs[:, i + 1])
+            opti.subject_to(opti.bounded(-t_bound, Us[:, i], t_bound))
+            cost += q * ca.sumsqr(Xs[6:12, i]) + r * ca.sumsqr(Us[:, i] / t_bound)
+            if corridor:
+                pos = Xs[6:9, i + 1] * scale_pos  # OSS: in meters
+                len_cut = np.sqrt(env.safety_radius**2 / np.tan(env.ang_corr) ** 2)
+                opti.subject_to(
+                    ca.sqrt(ca.sumsqr(pos) + 1e-6) * np.cos(env.ang_corr)
+                    - (pos[1] + len_cut)
+                    <= 0
+                )  # OSS: same constraint of corridor_const
+        cost += q_f * ca.sumsqr(Xs[6:12, horizon])
+        opti.minimize(cost)
+        opts = {"ipopt.print_level": 0, "print_time": 0, "ipopt.sb": "yes"}
+        if jit:
+            opts.update(jit_options())
+        opti.solver("ipopt", opts)
+        self.opti, self.Xs, self.Us, self.x0 = opti, Xs, Us, x0
+
+    def solve(self, x):
+        """
+        Solve the horizon from a state
+        :param x: State (target, relative, mass), adimensional, 13
+        :return: Thrust plan, adimensional, horizon x 3
+        """
+        opti = self.opti
+        opti.set_value(self.x0, x)
+        if self._guess is None:
+            opti.set_initial(self.Xs, np.tile(x / self.S, (self.horizon + 1, 1)).T)
+            opti.set_initial(self.Us, 0)
+        else:
+            Xs, Us = self._guess
+            opti.set_initial(self.Xs, Xs)
+            opti.set_initial(self.Us, Us)
+
+        t_start = time.perf_counter()
+        try:
+            sol = opti.solve()
+            Xs, Us = sol.value(self.Xs), sol.value(self.Us)
+        except RuntimeError:  # OSS: last iterate of a failed solve
+            Xs, Us = opti.debug.value(self.Xs), opti.debug.value(self.Us)
+        self.latency.append(time.perf_counter() - t_start)
+        self.iterations.append(opti.stats().get("iter_count"))
+
+        # Warm start of the next solve, shifted by k steps
+        Us = np.reshape(Us, (3, self.horizon))
+        Xs = np.reshape(Xs, (13, self.horizon + 1))
+        shift = min(self.k, self.horizon)
+        self._guess = (
+            np.hstack((Xs[:, shift:], np.repeat(Xs[:, -1:], shift, axis=1))),
+            np.hstack((Us[:, shift:], np.zeros((3, shift)))),
+        )
+
+        return (Tmax * Us).T
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        if episode_start is None or np.any(episode_start):
+            self._guess = None
+            self._steps = 0
+        x = self.env.scaler_reverse_observation(obs)[0:13]
+        if self._steps % self.k == 0:
+            self._plan = self.solve(x)
+            self._solved = self._steps
+        thrust = self._plan[self._steps - self._solved]
+        self._steps += 1
+
+        return thrust_to_action(self.env, thrust), None
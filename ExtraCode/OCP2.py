@@ -2,72 +2,7 @@ from mpopt import mp
 import numpy as np
 import casadi as ca
 import matplotlib.pyplot as plt
-
-
-def dynamics(x, u, t):
-    # Initialize ODE
-    mu = 0.012150583925359
-    m_star = 6.0458 * 1e24  # Kilograms
-    l_star = 3.844 * 1e8  # Meters
-    t_star = 375200  # Seconds
-    Isp = 310.0 / t_star
-    g0 = 9.81 / (l_star / t_star**2)
-    Tmax = 29620 / (m_star * l_star / t_star**2)
-    # Initialize Target State
-    xt = x[0]
-    yt = x[1]
-    zt = x[2]
-    xtdot = x[3]
-    ytdot = x[4]
-    ztdot = x[5]
-    # Initialize Relative State
-    xr = x[6]
-    yr = x[7]
-    zr = x[8]
-    xrdot = x[9]
-    yrdot = x[10]
-    zrdot = x[11]
-    m = x[12]
-
-    # Relative CRTBP Dynamics
-    r1t = [xt + mu, yt, zt]
-    r2t = [xt + mu - 1, yt, zt]
-    r1t_norm = ca.sqrt((xt + mu) ** 2 + yt**2 + zt**2)
-    r2t_norm = ca.sqrt((xt + mu - 1) ** 2 + yt**2 + zt**2)
-    rho = [xr, yr, zr]
-    r1t_rho = np.add(r1t, rho)
-    r1t_rho_norm = ca.sqrt(r1t_rho[0] ** 2 + r1t_rho[1] ** 2 + r1t_rho[2] ** 2)
-    r2t_rho = np.add(r2t, rho)
-    r2t_rho_norm = ca.sqrt(r2t_rho[0] ** 2 + r2t_rho[1] ** 2 + r2t_rho[2] ** 2)
-
-    return [
-        xtdot,
-        ytdot,
-        ztdot,
-        2 * ytdot
-        + xt
-        - (1 - mu) * (xt + mu) / r1t_norm**3
-        - mu * (xt + mu - 1) / r2t_norm**3,
-        -2 * xtdot + yt - (1 - mu) * yt / r1t_norm**3 - mu * yt / r2t_norm**3,
-        -(1 - mu) * zt / r1t_norm**3 - mu * zt / r2t_norm**3,
-        xrdot,
-        yrdot,
-        zrdot,
-        2 * yrdot
-        + xr
-        + (1 - mu) * ((xt + mu) / r1t_norm**3 - (xt + xr + mu) / r1t_rho_norm**3)
-        + mu * ((xt + mu - 1) / r2t_norm**3 - (xt + xr + mu - 1) / r2t_rho_norm**3)
-        + Tmax * u[0] * u[3] / (m * ca.sqrt(u[0] ** 2 + u[1] ** 2 + u[2] ** 2)),
-        -2 * xrdot
-        + yr
-        + (1 - mu) * (yt / r1t_norm**3 - (yt + yr) / r1t_rho_norm**3)
-        + mu * (yt / r2t_norm**3 - (yt + yr) / r2t_rho_norm**3)
-        + Tmax * u[1] * u[3] / (m * ca.sqrt(u[0] ** 2 + u[1] ** 2 + u[2] ** 2)),
-        (1 - mu) * (zt / r1t_norm**3 - (zt + zr) / r1t_rho_norm**3)
-        + mu * (zt / r2t_norm**3 - (zt + zr) / r2t_rho_norm**3)
-        + Tmax * u[2] * u[3] / (m * ca.sqrt(u[0] ** 2 + u[1] ** 2 + u[2] ** 2)),
-        -Tmax * u[3] / (Isp * g0),
-    ]
+from CasadiDynamics import dynamics, jit_options
 
 
 def running_costs(x, u, t):
@@ -101,6 +36,7 @@ l_star = 3.844 * 1e8  # Meters
 t_star = 375200  # Seconds
 mass = 21000
 max_thrust = 29620
+jit = False  # OSS: True to JIT-compile the NLP functions (C compiler needed)
 
 # Initial state
 ocp.x00[0] = [
@@ -190,7 +126,9 @@ ocp.scale_t = t_star / 80
 ocp.validate()
 
 # Solve
-mpo, post = mp.solve(ocp, n_segments=1, poly_orders=4, scheme="LGR", plot=False)
+mpo = mp.mpopt(ocp, 1, 4, "LGR")
+nlp_sol = mpo.solve(**({"nlp_solver_options": jit_options()} if jit else {}))
+post = mpo.process_results(nlp_sol, plot=False)
 
 # Post-process
 x0, u0, t0, _ = post.get_data(phases=0, interpolate=True)
@@ -0,0 +1,72 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from Pareto import pareto_sweep
+
+# Data
+m_star = 6.0458 * 1e24  # Kilograms
+mass = 21000
+
+# Initial state (OSS: same of OCP.py)
+x00 = np.array(
+    [
+        1.02206694e00,
+        -1.32282592e-07,
+        -1.82100000e-01,
+        -1.69229909e-07,
+        -1.03353155e-01,
+        6.44013821e-07,
+        1.08357767e-13,
+        1.32282592e-07,
+        -4.12142542e-13,
+        1.69229909e-07,
+        -3.65860120e-13,
+        -6.44013821e-07,
+        mass / m_star,
+    ]
+)
+
+# Grid: fixed times of flight and corridor half-angles
+tof_vec = np.linspace(15, 60, 10)
+ang_vec = np.deg2rad([10, 15, 20, 30])
+
+if __name__ == "__main__":  # OSS: needed by the process pool
+    sweep = pareto_sweep(
+        x00,
+        tof_bounds=[(tof, tof) for tof in tof_vec],
+        ang_corr=ang_vec,
+        n_workers=8,
+        solve_kwargs={"n_segments": 1, "poly_orders": 4, "scheme": "LGR"},
+    )
+
+    # Save
+    rows = [
+        (sweep["tof"][i, j], np.rad2deg(ang_vec[j]), sweep["dv"][i, j], sweep["front"][i, j])
+        for i in range(len(tof_vec))
+        for j in range(len(ang_vec))
+        if sweep["converged"][i, j]
+    ]
+    np.savetxt(
+        "OCPpareto.csv",
+        np.array(rows, dtype=float),
+        delimiter=",",
+        header="tof,ang_corr,dv,pareto",
+        comments="",
+    )
+
+    # Plot
+    plt.figure()
+    for j, ang in enumerate(ang_vec):
+        front = sweep["front"][:, j]
+        plt.plot(
+            sweep["tof"][front, j],
+            sweep["dv"][front, j],
+            "o-",
+            linewidth=2,
+            label="%d deg" % np.rad2deg(ang),
+        )
+    plt.grid(True)
+    plt.xlabel("ToF [s]")
+    plt.ylabel("$\Delta V$ [m/s]")
+    plt.legend()
+    plt.savefig(".\OCPpareto.pdf")
+    plt.show()
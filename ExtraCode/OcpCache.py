@@ -0,0 +1,116 @@
+# Import libraries
+import os
+import pickle
+import numpy as np
+from scipy.spatial import cKDTree
+from OcpProblem import ic_features
+
+
+def problem_key(ocp_kwargs=None, solve_kwargs=None):
+    """
+    Key of the problem parameters: time bounds, constraints and mesh
+    :param ocp_kwargs: Arguments of build_ocp
+    :param solve_kwargs: Arguments of solve_ocp
+    :return: Hashable key
+    """
+    params = dict({} if ocp_kwargs is None else ocp_kwargs)
+    params.update({} if solve_kwargs is None else solve_kwargs)
+    params.pop("jit", None)  # OSS: same solution, compiled or not
+    key = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, str):
+            key.append((name, value))
+        else:
+            key.append((name, tuple(np.round(np.atleast_1d(value).astype(float), 12))))
+    return tuple(key)
+
+
+class OcpCache:
+    """
+    Persistent OCP solutions keyed by problem parameters and initial condition
+    (relative state and mass), with a KD-tree over the initial conditions of
+    every problem for nearest-neighbour warm starts.
+
+    :param path: Pickle file, None to keep the cache in memory only
+    :param tol: Distance of an exact hit, in the features of ic_features
+    """
+
+    def __init__(self, path=None, tol=1e-9):
+        self.path = path
+        self.tol = tol
+        self.solutions = {}  # OSS: problem key: list of solutions
+        self._trees = {}
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as file:
+                self.solutions = pickle.load(file)
+
+    def __len__(self):
+        return sum(len(sols) for sols in self.solutions.values())
+
+    def _tree(self, key, scale_pos):
+        if key not in self._trees:
+            features = ic_features([sol["x00"] for sol in self.solutions[key]], scale_pos)
+            self._trees[key] = cKDTree(features)
+        return self._trees[key]
+
+    def put(self, sol, ocp_kwargs=None, solve_kwargs=None):
+        """
+        Store a converged solution (OSS: mpopt objects are not stored)
+        :param sol: Dictionary returned by solve_ocp, with x00
+        :param ocp_kwargs: Arguments of build_ocp
+        :param solve_kwargs: Arguments of solve_ocp
+        """
+        key = problem_key(ocp_kwargs, solve_kwargs)
+        sol = {name: value for name, value in sol.items() if name not in ("mpo", "post")}
+        self.solutions.setdefault(key, []).append(sol)
+        self._trees.pop(key, None)
+
+    def nearest(self, x00, ocp_kwargs=None, solve_kwargs=None, k=1):
+        """
+        Nearest cached solutions of the same problem
+        :param x00: Initial state, adimensional, 13
+        :param ocp_kwargs: Arguments of build_ocp
+        :param solve_kwargs: Arguments of solve_ocp
+        :param k: Number of neighbours
+        :return: List of (distance, solution), closest first
+        """
+        key = problem_key(ocp_kwargs, solve_kwargs)
+        if not self.solutions.get(key):
+            return []
+        scale_pos = ({} if ocp_kwargs is None else ocp_kwargs).get("scale_pos", 50)
+        dist, idx = self._tree(key, scale_pos).query(
+            ic_features(x00, scale_pos), k=min(k, len(self.solutions[key]))
+        )
+        return [
+            (d, self.solutions[key][i]) for d, i in zip(np.atleast_1d(dist), np.atleast_1d(idx))
+        ]
+
+    def get(self, x00, ocp_kwargs=None, solve_kwargs=None):
+        """
+        Exact hit
+        :return: Cached solution, None if missing
+        """
+        hits = self.nearest(x00, ocp_kwargs, solve_kwargs)
+        if hits and hits[0][0] <= self.tol:
+            return hits[0][1]
+        return None
+
+    def merge(self, new_solutions):
+        """
+        Store solutions found in other processes, skipping exact hits
+        :param new_solutions: List of (solution, ocp_kwargs, solve_kwargs)
+        :return: Number of stored solutions
+        """
+        n_new = 0
+        for sol, ocp_kwargs, solve_kwargs in new_solutions:
+            if self.get(sol["x00"], ocp_kwargs, solve_kwargs) is None:
+                self.put(sol, ocp_kwargs, solve_kwargs)
+                n_new += 1
+        return n_new
+
+    def save(self):
+        if self.path is None:
+            return
+        with open(self.path + ".tmp", "wb") as file:
+            pickle.dump(self.solutions, file)
+        os.replace(self.path + ".tmp", self.path)  # OSS: atomic
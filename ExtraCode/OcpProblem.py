@@ -0,0 +1,461 @@
+# Import libraries
+import multiprocessing
+import time
+from functools import partial
+from mpopt import mp
+import numpy as np
+import casadi as ca
+from scipy.integrate import solve_ivp
+from CasadiDynamics import dynamics, jit_options, rel_crtbp_function
+
+# DATA
+m_star = 6.0458 * 1e24  # Kilograms
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+mass = 21000
+max_thrust = 29620
+Isp = 310
+
+
+def running_costs(x, u, t):
+    u_vec = u[3] * np.array([u[0], u[1], u[2]])
+    return u_vec[0] * u_vec[0] + u_vec[1] * u_vec[1] + u_vec[2] * u_vec[2]
+
+
+def path_constraints(x, u, t, ang_corr=np.deg2rad(20)):
+    return [x[7] ** 2 - (x[6] ** 2 + x[7] ** 2 + x[8] ** 2) * ca.cos(ang_corr) ** 2]
+
+
+def terminal_constraints(x, t, x0, t0):
+    return [x[6], x[7], x[8], x[9], x[10], x[11]]
+
+
+def build_ocp(
+    x00,
+    tof_bounds=(20, 40),
+    ang_corr=np.deg2rad(20),
+    pos_margin=1.1,
+    vel_max=5,
+    mass_min=0.6,
+    scale_pos=50,
+    scale_tof=30,
+):
+    """
+    Minimum-energy rendezvous OCP of OCPmcm.py from a given initial state
+    :param x00: Initial state (target, relative, mass), adimensional, 13
+    :param tof_bounds: Bounds of the time of flight [s]
+    :param ang_corr: Approach corridor half-angle [rad]
+    :param pos_margin: Relative position bounds w.r.t. the initial distance
+    :param vel_max: Relative velocity bounds [m/s]
+    :param mass_min: Minimum mass w.r.t. the initial one
+    :param scale_pos: Scale of the relative position [m]
+    :param scale_tof: Scale of the time of flight [s]
+    :return: mpopt OCP
+    """
+    x00 = np.asarray(x00, dtype=float)
+    m0 = x00[12]
+    ocp = mp.OCP(n_states=13, n_controls=4, n_phases=1)
+    ocp.dynamics[0] = dynamics
+    ocp.running_costs[0] = running_costs
+    ocp.terminal_constraints[0] = terminal_constraints
+    ocp.path_constraints[0] = partial(path_constraints, ang_corr=ang_corr)
+
+    # Initial state and guess
+    ocp.x00[0] = list(x00)
+    ocp.xf0[0] = list(np.concatenate((x00[0:6], np.zeros(6), [0.8 * m0])))
+    ocp.u00[0], ocp.uf0[0] = [0, -1, 0, 1], [0, 0, 0, 0]
+    ocp.t00[0] = 0
+
+    # Box constraints
+    rho0 = np.linalg.norm(x00[6:9]) * pos_margin
+    ocp.lbx[0] = [
+        379548434.40513575 / l_star,
+        -16223383.008425826 / l_star,
+        -70002940.10058032 / l_star,
+        -81.99561388926969 / (l_star / t_star),
+        -105.88740121359594 / (l_star / t_star),
+        -881.9954974936014 / (l_star / t_star),
+        -rho0,
+        -rho0,
+        -rho0,
+        -vel_max / (l_star / t_star),
+        -vel_max / (l_star / t_star),
+        -vel_max / (l_star / t_star),
+        mass_min * m0,
+    ]
+    ocp.ubx[0] = [
+        392882530.7281463 / l_star,
+        16218212.912172267 / l_star,
+        3248770.078052207 / l_star,
+        82.13051133777446 / (l_star / t_star),
+        1707.5720010497114 / (l_star / t_star),
+        881.8822374702228 / (l_star / t_star),
+        rho0,
+        rho0,
+        rho0,
+        vel_max / (l_star / t_star),
+        vel_max / (l_star / t_star),
+        vel_max / (l_star / t_star),
+        m0,
+    ]
+    ocp.lbu[0], ocp.ubu[0] = [-1, -1, -1, 0], [1, 1, 1, 1]
+    ocp.lbtf[0], ocp.ubtf[0] = tof_bounds[0] / t_star, tof_bounds[1] / t_star
+    ocp.lbt0[0], ocp.ubt0[0] = 0, 0
+
+    # Scaling
+    ocp.scale_x = [
+        l_star / 392882530,
+        l_star / 392882530,
+        l_star / 392882530,
+        l_star / t_star / 1707,
+        l_star / t_star / 1707,
+        l_star / t_star / 1707,
+        l_star / scale_pos,
+        l_star / scale_pos,
+        l_star / scale_pos,
+        l_star / t_star / 0.5,
+        l_star / t_star / 0.5,
+        l_star / t_star / 0.5,
+        m_star / mass,
+    ]
+    ocp.scale_t = t_star / scale_tof
+    ocp.validate()
+
+    return ocp
+
+
+def solve_ocp(
+    ocp, n_segments=1, poly_orders=4, scheme="LGR", pos_tol=1, warm=None, jit=False
+):
+    """
+    Solve the OCP and post-process its solution
+    :param ocp: mpopt OCP
+    :param n_segments: Number of segments
+    :param poly_orders: Polynomial order of every segment
+    :param scheme: Collocation scheme
+    :param pos_tol: Final relative distance of a converged solution [m]
+    :param warm: Solution of a nearby problem to warm-start from, None for a cold start
+    :param jit: True to JIT-compile the NLP functions and derivatives (C compiler needed)
+    :return: Dictionary with state, control, time [s], DV [m/s], convergence,
+        NLP solution, IPOPT iterations and solve time [s]
+    """
+    # Warm start: guesses of final state, controls and final time, NLP variables
+    # (OSS: the latter only with the same discretization)
+    initial_solution = None
+    if warm is not None:
+        ocp.xf0[0] = list(warm["x"][-1])
+        ocp.u00[0], ocp.uf0[0] = list(warm["u"][0]), list(warm["u"][-1])
+        ocp.tf0[0] = np.clip(warm["tof"] / t_star, ocp.lbtf[0], ocp.ubtf[0])
+        ocp.validate()
+        if warm.get("mesh") == (n_segments, poly_orders, scheme):
+            initial_solution = warm["nlp"]
+
+    # Solve
+    mpo = mp.mpopt(ocp, n_segments, poly_orders, scheme)
+    t_start = time.perf_counter()
+    options = {"nlp_solver_options": jit_options()} if jit else {}
+    nlp_sol = mpo.solve(initial_solution=initial_solution, **options)
+    solve_time = time.perf_counter() - t_start
+    stats = mpo.nlp_solver.stats()
+    post = mpo.process_results(nlp_sol, plot=False)
+
+    # Post-process
+    x, u, t, _ = post.get_data(phases=0, interpolate=True)
+    t = np.asarray(t).flatten() * t_star
+    rf = np.linalg.norm(x[-1, 6:9]) * l_star
+    vf = np.linalg.norm(x[-1, 9:12]) * l_star / t_star
+
+    return {
+        "x": x,
+        "u": u,
+        "t": t,
+        "tof": t[-1],
+        "dv": Isp * 9.81 * np.log(x[0, 12] / x[-1, 12]),
+        "rf": rf,
+        "vf": vf,
+        "converged": rf < pos_tol,
+        "nlp": {"x": np.array(nlp_sol["x"]).flatten()},
+        "mesh": (n_segments, poly_orders, scheme),
+        "iterations": stats.get("iter_count"),
+        "status": stats.get("return_status"),
+        "solve_time": solve_time,
+        "warm": warm is not None,
+        "mpo": mpo,
+        "post": post,
+    }
+
+
+def collocation_error(sol, n_segments, scale_x):
+    """
+    A posteriori error of every segment: the segment is re-integrated from its
+    initial state with the interpolated controls and the end state is compared
+    with the collocated one (OSS: segments of equal duration)
+    :param sol: Dictionary returned by solve_ocp
+    :param n_segments: Number of segments
+    :param scale_x: State scaling of the OCP
+    :return: Maximum scaled state error per segment
+    """
+    f = rel_crtbp_function()
+    t = sol["t"] / t_star
+    x, u = sol["x"], sol["u"]
+    bounds = np.linspace(t[0], t[-1], n_segments + 1)
+
+    def interp(values, tau):
+        return np.array([np.interp(tau, t, values[:, j]) for j in range(values.shape[1])])
+
+    def rhs(tau, y):
+        return np.array(f(y, interp(u, tau))).flatten()
+
+    errors = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        prop = solve_ivp(
+            fun=rhs,
+            t_span=(a, b),
+            y0=interp(x, a),
+            method="LSODA",
+            rtol=2.220446049250313e-14,
+            atol=2.220446049250313e-14,
+        )
+        errors.append(np.max(np.abs(prop.y[:, -1] - interp(x, b)) * np.asarray(scale_x)))
+
+    return np.array(errors)
+
+
+def solve_refined(
+    x00,
+    ocp_kwargs=None,
+    tol=1e-3,
+    poly_order=4,
+    max_order=10,
+    max_iter=6,
+    scheme="LGR",
+    warm=None,
+    **solve_kwargs
+):
+    """
+    Adaptive mesh refinement: segments over the tolerance get a higher
+    polynomial order (p-refinement, by the exceeded orders of magnitude), and
+    all segments are split when an order would exceed max_order
+    (h-refinement). Every mesh gets the final state, end controls and time of
+    flight of the previous solution as guesses (OSS: the NLP variables are not
+    interpolated onto the new collocation nodes, so the inner iterations are a
+    cold start)
+    :param x00: Initial state, adimensional, 13
+    :param ocp_kwargs: Arguments of build_ocp
+    :param tol: Tolerance on the scaled state error of every segment
+    :param poly_order: Polynomial order of the initial mesh (one segment)
+    :param max_order: Maximum polynomial order of a segment
+    :param max_iter: Maximum number of meshes
+    :param scheme: Collocation scheme
+    :param warm: Solution to take the guesses of the first mesh from
+    :param solve_kwargs: Other arguments of solve_ocp
+    :return: Solution of the last mesh, with error and mesh history
+    """
+    ocp_kwargs = {} if ocp_kwargs is None else ocp_kwargs
+    orders = [poly_order]
+    history = []
+    sol = warm
+    for _ in range(max_iter):
+        ocp = build_ocp(x00, **ocp_kwargs)
+        sol = solve_ocp(
+            ocp,
+            n_segments=len(orders),
+            poly_orders=list(orders),
+            scheme=scheme,
+            warm=sol,
+            **solve_kwargs
+        )
+        errors = collocation_error(sol, len(orders), ocp.scale_x)
+        history.append(
+            {
+                "poly_orders": list(orders),
+                "nodes": int(np.sum(np.array(orders) + 1)),
+                "errors": errors,
+                "iterations": sol["iterations"],
+                "solve_time": sol["solve_time"],
+            }
+        )
+        print(
+            "Mesh %s: max error %.2e, %s iterations, %.2f s"
+            % (orders, errors.max(), sol["iterations"], sol["solve_time"])
+        )
+        if errors.max() <= tol:
+            break
+
+        # Refinement
+        new_orders = [
+            p + max(1, int(np.ceil(np.log10(e / tol)))) if e > tol else p
+            for p, e in zip(orders, errors)
+        ]
+        if max(new_orders) > max_order:
+            new_orders = [p for p in orders for _ in range(2)]
+        orders = new_orders
+    sol["error"] = errors.max()
+    sol["mesh_history"] = history
+
+    return sol
+
+
+def ic_features(x00, scale_pos=50):
+    """
+    Features of an initial condition for nearest-neighbour search, in the
+    scaling of build_ocp: relative position, velocity and mass
+    :param x00: Initial state, adimensional, 13 (or n x 13)
+    :param scale_pos: Scale of the relative position [m]
+    :return: Features, 7 (or n x 7)
+    """
+    x00 = np.asarray(x00, dtype=float)
+    scale = np.array(
+        [l_star / scale_pos] * 3 + [l_star / t_star / 0.5] * 3 + [m_star / mass]
+    )
+    return x00[..., 6:13] * scale
+
+
+def _solve_task(task):
+    """
+    Solve one OCP of a campaign (OSS: top-level to be picklable by workers)
+    :param task: Dictionary with x00, warm start, OCP and solver arguments
+    :return: Dictionary returned by solve_ocp, without mpopt objects
+    """
+    try:
+        if task["mesh_tol"] is None:
+            ocp = build_ocp(task["x00"], **task["ocp_kwargs"])
+            sol = solve_ocp(ocp, warm=task["warm"], **task["solve_kwargs"])
+        else:
+            solve_kwargs = dict(task["solve_kwargs"])
+            solve_kwargs.pop("n_segments", None)  # OSS: the mesh is adapted
+            sol = solve_refined(
+                task["x00"],
+                task["ocp_kwargs"],
+                tol=task["mesh_tol"],
+                poly_order=solve_kwargs.pop("poly_orders", 4),
+                warm=task["warm"],
+                **solve_kwargs
+            )
+    except RuntimeError as error:  # OSS: failed NLP, e.g. restoration failure
+        print("OCP %d failed: %s" % (task["index"], error))
+        return {"index": task["index"], "converged": False, "x00": task["x00"]}
+    del sol["mpo"], sol["post"]
+    sol["index"] = task["index"]
+    sol["x00"] = task["x00"]
+
+    return sol
+
+
+def solve_campaign(
+    x00_vec,
+    n_workers=1,
+    warm_start=True,
+    ocp_kwargs=None,
+    solve_kwargs=None,
+    cache=None,
+    mesh_tol=None,
+):
+    """
+    Solve many OCPs in a pool of processes. Problems are submitted in waves of
+    n_workers, each warm-started from the nearest converged solution of the
+    previous waves or of the cache (the first problem, usually the nominal one, is
+    cold-started on an empty cache)
+    :param x00_vec: Initial states, n x 13
+    :param n_workers: Number of processes
+    :param warm_start: False to cold-start every problem
+    :param ocp_kwargs: Arguments of build_ocp
+    :param solve_kwargs: Arguments of solve_ocp
+    :param cache: OcpCache for exact hits, warm starts and new solutions, None if unused
+    :param mesh_tol: Tolerance of solve_refined, None for the fixed mesh of solve_kwargs
+    :return: List of solutions, same order of the initial states
+    """
+    ocp_kwargs = {} if ocp_kwargs is None else ocp_kwargs
+    solve_kwargs = {} if solve_kwargs is None else solve_kwargs
+    cache_kwargs = dict(solve_kwargs)
+    if mesh_tol is not None:
+        cache_kwargs["mesh_tol"] = mesh_tol  # OSS: refined solutions kept apart
+    x00_vec = np.atleast_2d(x00_vec)
+    scale_pos = ocp_kwargs.get("scale_pos", 50)
+    solved = []
+    results = [None] * len(x00_vec)
+
+    def nearest(x00):
+        if not warm_start:
+            return None
+        candidates = []
+        if cache is not None:
+            candidates = cache.nearest(x00, ocp_kwargs, cache_kwargs)
+        if solved:
+            features = ic_features([s["x00"] for s in solved], scale_pos)
+            dist = np.linalg.norm(features - ic_features(x00, scale_pos), axis=1)
+            candidates.append((dist.min(), solved[int(np.argmin(dist))]))
+        if not candidates:
+            return None
+        return min(candidates, key=lambda candidate: candidate[0])[1]
+
+    # Exact hits of the cache
+    todo = []
+    for i, x00 in enumerate(x00_vec):
+        sol = None if cache is None else cache.get(x00, ocp_kwargs, cache_kwargs)
+        if sol is None:
+            todo.append(i)
+        else:
+            results[i] = dict(sol, index=i, cached=True)
+    if cache is not None:
+        print("OCP cache hits %d, to solve %d" % (len(x00_vec) - len(todo), len(todo)))
+
+    pool = multiprocessing.Pool(n_workers) if n_workers > 1 else None
+    try:
+        waves = [todo[0:1]] + [
+            todo[i : i + n_workers] for i in range(1, len(todo), n_workers)
+        ]
+        for wave in waves:
+            if not wave:
+                continue
+            tasks = [
+                {
+                    "index": i,
+                    "x00": x00_vec[i],
+                    "warm": nearest(x00_vec[i]),
+                    "ocp_kwargs": ocp_kwargs,
+                    "solve_kwargs": solve_kwargs,
+                    "mesh_tol": mesh_tol,
+                }
+                for i in wave
+            ]
+            sols = map(_solve_task, tasks) if pool is None else pool.map(_solve_task, tasks)
+            for sol in sols:
+                results[sol["index"]] = sol
+                if sol["converged"]:
+                    solved.append(sol)
+                    if cache is not None:
+                        cache.put(sol, ocp_kwargs, cache_kwargs)
+                    print(
+                        "OCP %d: DV %.4f m/s, ToF %.2f s, %s iterations, %.2f s (%s)"
+                        % (
+                            sol["index"],
+                            sol["dv"],
+                            sol["tof"],
+                            sol["iterations"],
+                            sol["solve_time"],
+                            "warm" if sol["warm"] else "cold",
+                        )
+                    )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if cache is not None:
+            cache.save()
+
+    return results
+
+
+def thrust_profile(sol):
+    """
+    Thrust vector of an OCP solution, adimensional
+    :param sol: Dictionary returned by solve_ocp
+    :return: Thrust, n x 3
+    """
+    u = sol["u"]
+    Tmax = max_thrust / (m_star * l_star / t_star**2)
+    direction = u[:, 0:3] / np.maximum(
+        np.linalg.norm(u[:, 0:3], axis=1, keepdims=True), 1e-12
+    )
+    return Tmax * u[:, 3:4] * direction
@@ -0,0 +1,116 @@
+# Import libraries
+import multiprocessing
+import numpy as np
+from OcpProblem import _solve_task
+
+
+def pareto_front(tof, dv):
+    """
+    Non-dominated points, both objectives minimized
+    :param tof: Time of flight [s]
+    :param dv: DV [m/s]
+    :return: Boolean mask of the front
+    """
+    tof, dv = np.asarray(tof, dtype=float), np.asarray(dv, dtype=float)
+    valid = ~np.isnan(tof) & ~np.isnan(dv)
+    front = np.zeros(len(tof), dtype=bool)
+    for i in np.flatnonzero(valid):
+        dominated = (
+            valid
+            & (tof <= tof[i])
+            & (dv <= dv[i])
+            & ((tof < tof[i]) | (dv < dv[i]))
+        )
+        front[i] = not dominated.any()
+    return front
+
+
+def pareto_sweep(
+    x00,
+    tof_bounds,
+    ang_corr,
+    n_workers=1,
+    ocp_kwargs=None,
+    solve_kwargs=None,
+    mesh_tol=None,
+):
+    """
+    OCP over a grid of time-of-flight bounds and corridor angles, by
+    homotopy continuation: every cell is warm-started from a converged
+    neighbour (previous ToF first, then previous angle), and the cells of the
+    same anti-diagonal of the grid, independent of each other, are solved in
+    parallel
+    :param x00: Initial state, adimensional, 13
+    :param tof_bounds: List of ToF bounds (lower, upper) [s], lower = upper to fix it
+    :param ang_corr: List of corridor half-angles [rad]
+    :param n_workers: Number of processes
+    :param ocp_kwargs: Other arguments of build_ocp
+    :param solve_kwargs: Arguments of solve_ocp
+    :param mesh_tol: Tolerance of solve_refined, None for the fixed mesh
+    :return: Dictionary with grids of DV [m/s], ToF [s], convergence and solutions
+    """
+    ocp_kwargs = {} if ocp_kwargs is None else ocp_kwargs
+    solve_kwargs = {} if solve_kwargs is None else solve_kwargs
+    ni, nj = len(tof_bounds), len(ang_corr)
+    sols = {}
+
+    def neighbour(i, j):
+        for cell in [(i - 1, j), (i, j - 1)]:
+            if cell in sols and sols[cell]["converged"]:
+                return sols[cell]
+        return None
+
+    pool = multiprocessing.Pool(n_workers) if n_workers > 1 else None
+    try:
+        for d in range(ni + nj - 1):
+            cells = [(i, d - i) for i in range(ni) if 0 <= d - i < nj]
+            tasks = [
+                {
+                    "index": i * nj + j,
+                    "x00": np.asarray(x00, dtype=float),
+                    "warm": neighbour(i, j),
+                    "ocp_kwargs": dict(
+                        ocp_kwargs, tof_bounds=tof_bounds[i], ang_corr=ang_corr[j]
+                    ),
+                    "solve_kwargs": solve_kwargs,
+                    "mesh_tol": mesh_tol,
+                }
+                for i, j in cells
+            ]
+            results = map(_solve_task, tasks) if pool is None else pool.map(_solve_task, tasks)
+            for (i, j), sol in zip(cells, results):
+                sols[(i, j)] = sol
+                if sol["converged"]:
+                    print(
+                        "ToF in [%.1f, %.1f] s, corridor %.1f deg: DV %.4f m/s, ToF %.2f s"
+                        % (
+                            tof_bounds[i][0],
+                            tof_bounds[i][1],
+                            np.rad2deg(ang_corr[j]),
+                            sol["dv"],
+                            sol["tof"],
+                        )
+                    )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    # Grids (OSS: NaN where not converged)
+    converged = np.array([[sols[(i, j)]["converged"] for j in range(nj)] for i in range(ni)])
+    dv = np.full((ni, nj), np.nan)
+    tof = np.full((ni, nj), np.nan)
+    for (i, j), sol in sols.items():
+        if sol["converged"]:
+            dv[i, j], tof[i, j] = sol["dv"], sol["tof"]
+    front = np.array([pareto_front(tof[:, j], dv[:, j]) for j in range(nj)]).T
+
+    return {
+        "tof_bounds": np.asarray(tof_bounds, dtype=float),
+        "ang_corr": np.asarray(ang_corr, dtype=float),
+        "dv": dv,
+        "tof": tof,
+        "converged": converged,
+        "front": front,  # OSS: Pareto front of every corridor angle
+        "solutions": sols,
+    }
@@ -0,0 +1,67 @@
+# Import libraries
+import gym
+import numpy as np
+
+
+class ResidualAction(gym.Wrapper):
+    """
+    Residual RL: the policy action is added, scaled, to the action of a baseline
+    feedback controller (LqrController, MpcController...) before the environment
+    applies scaler_reverse_action. With a zero policy action the baseline flies
+    the episode, so training starts from a competent controller.
+
+    :param env: Environment
+    :param baseline: Controller with SB3 predict interface, built on env
+    :param scale: Scale of the policy action, in units of the action box
+    """
+
+    def __init__(self, env, baseline, scale=0.2):
+        super().__init__(env)
+        self.baseline = baseline
+        self.scale = scale
+        self.last_action = np.zeros(3, dtype=np.float32)  # OSS: applied action
+        self._obs = None
+        self._start = True
+
+    def reset(self, **kwargs):
+        self._obs = self.env.reset(**kwargs)
+        self._start = True
+        return self._obs
+
+    def action(self, action):
+        """
+        Baseline action plus scaled policy action, clipped on the action box
+        :param action: Policy action
+        :return: Applied action
+        """
+        base, _ = self.baseline.predict(
+            self._obs, episode_start=np.array([self._start]), deterministic=True
+        )
+        action = base + self.scale * np.asarray(action)
+        low, high = self.action_space.low, self.action_space.high
+        return np.clip(action, low, high).astype(np.float32)
+
+    def step(self, action):
+        self.last_action = self.action(action)
+        self._obs, reward, done, info = self.env.step(self.last_action)
+        self._start = False
+        return self._obs, reward, done, info
+
+
+def make_baseline(env, baseline="LQR", **kwargs):
+    """
+    Baseline controller of the residual mode
+    :param env: Environment
+    :param baseline: "LQR" or "MPC"
+    :param kwargs: Arguments of the controller
+    :return: Controller
+    """
+    if baseline == "LQR":
+        from Controllers import LqrController
+
+        return LqrController(env, **kwargs)
+    if baseline == "MPC":
+        from Mpc import MpcController
+
+        return MpcController(env, **kwargs)
+    raise ValueError("Unknown baseline %s" % baseline)
@@ -0,0 +1,138 @@
+# Import libraries
+import argparse
+import time
+import numpy as np
+import torch
+from MonteCarloEngine import episode_seed, run_episode
+from Scenario import load_model, make_env
+
+try:
+    import resource  # OSS: not available on Windows
+except ImportError:
+    resource = None
+
+
+def peak_memory():
+    """
+    Peak resident memory of the process
+    :return: Peak RSS [MB], NaN if not available
+    """
+    if resource is None:
+        return np.nan
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # OSS: kB on Linux
+
+
+def record_observations(env, model, n_episodes=5, seed=0):
+    """
+    Scaled observations of closed-loop episodes of the policy, to be replayed
+    by the timed calls with the distribution of a real rollout
+    :param env: Environment
+    :param model: Loaded SB3 model
+    :param n_episodes: Number of episodes
+    :param seed: Seed of the campaign
+    :return: Observations n x 16, episode starts n
+    """
+    obs_vec, starts = [], []
+    for i in range(n_episodes):
+        result = run_episode(env, model, index=i, seed=episode_seed(seed, i), record=True)
+        obs_vec.append(env.scaler_apply_observation(result["obs"][:-1]))
+        starts.append(np.arange(len(obs_vec[-1])) == 0)
+    space = model.observation_space
+    return np.concatenate(obs_vec).astype(space.dtype), np.concatenate(starts)
+
+
+def benchmark_policy(
+    model, recurrent, obs_vec, starts, n_warmup=100, n_calls=1000, n_threads=1
+):
+    """
+    Latency of single-sample deterministic inference, as used onboard
+    :param model: Loaded SB3 model
+    :param recurrent: True if the policy carries LSTM states between calls
+    :param obs_vec: Recorded observations, replayed in order (and cycled)
+    :param starts: Episode starts of the recorded observations
+    :param n_warmup: Number of untimed calls before measuring
+    :param n_calls: Number of timed calls
+    :param n_threads: Number of torch intra-op threads
+    :return: Dictionary of latency [s] and memory [MB] statistics
+    """
+    # Initialization
+    torch.set_num_threads(n_threads)
+    lstm_states = None
+    dt_cost = np.zeros(n_calls)
+
+    # Warm-up and timed calls (OSS: LSTM states are propagated as in a rollout)
+    for i in range(n_warmup + n_calls):
+        j = i % len(obs_vec)
+        t1 = time.perf_counter()
+        if recurrent:
+            action, lstm_states = model.predict(
+                obs_vec[j],
+                state=lstm_states,
+                episode_start=np.array([starts[j]]),
+                deterministic=True,
+            )
+        else:
+            action, _ = model.predict(obs_vec[j], deterministic=True)
+        tc = time.perf_counter() - t1
+        if i >= n_warmup:
+            dt_cost[i - n_warmup] = tc
+
+    # Statistics
+    params = sum(p.numel() * p.element_size() for p in model.policy.parameters())
+    return {
+        "mean": dt_cost.mean(),
+        "std": dt_cost.std(),
+        "p50": np.percentile(dt_cost, 50),
+        "p95": np.percentile(dt_cost, 95),
+        "p99": np.percentile(dt_cost, 99),
+        "max": dt_cost.max(),
+        "params_mb": params / 1024**2,
+        "peak_rss_mb": peak_memory(),
+        "samples": dt_cost,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Policy inference latency")
+    parser.add_argument("--mlp", default=None, help="Saved PPO model")
+    parser.add_argument("--lstm", default=None, help="Saved RecurrentPPO model")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--episodes", type=int, default=5, help="Recorded episodes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    env = make_env()
+
+    # Benchmark every given policy with the same settings
+    policies = [("MLP", args.mlp, False), ("LSTM", args.lstm, True)]
+    for name, path, recurrent in policies:
+        if path is None:
+            continue
+        model = load_model(path, recurrent)
+        obs_vec, starts = record_observations(env, model, args.episodes, args.seed)
+        stats = benchmark_policy(
+            model,
+            recurrent,
+            obs_vec,
+            starts,
+            n_warmup=args.warmup,
+            n_calls=args.calls,
+            n_threads=args.threads,
+        )
+        print(
+            "%s (%s), %d threads: mean %.3e s, p50 %.3e s, p95 %.3e s, p99 %.3e s, "
+            "max %.3e s, parameters %.3f MB, peak RSS %.1f MB"
+            % (
+                name,
+                path,
+                args.threads,
+                stats["mean"],
+                stats["p50"],
+                stats["p95"],
+                stats["p99"],
+                stats["max"],
+                stats["params_mb"],
+                stats["peak_rss_mb"],
+            )
+        )
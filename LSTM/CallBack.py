@@ -1,3 +1,4 @@
+import numpy as np
 from stable_baselines3.common.callbacks import BaseCallback
 
 class CallBack(BaseCallback):
@@ -16,3 +17,52 @@ class CallBack(BaseCallback):
     def _on_rollout_end(self):
         self.env.reset()
         pass
+
+
+class UnscentedCallBack(BaseCallback):
+    """
+    Robustness read of the current policy every eval_freq rollouts, from the
+    sigma-point episodes of the unscented transform.
+
+    :param engine: MonteCarloEngine whose policy_fn loads the checkpoint path
+        (OSS: its pool is kept for the whole training, workers load the new
+        parameters in their live model)
+    :param std: Standard deviation of the initial state
+    :param path: Checkpoint path
+    :param eval_freq: Number of rollouts between evaluations
+    :param verbose: Verbosity level: 0 for no output, 1 for info messages, 2 for debug messages
+    """
+    def __init__(self, engine, std, path, eval_freq=10, verbose=0):
+        super(UnscentedCallBack, self).__init__(verbose)
+        self.engine = engine
+        self.std = std
+        self.path = path
+        self.eval_freq = eval_freq
+        self.n_rollouts = 0
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        from Unscented import unscented
+
+        self.n_rollouts += 1
+        if self.n_rollouts % self.eval_freq != 0:
+            return
+
+        # Workers load the parameters of the latest checkpoint
+        self.model.save(self.path)
+        self.engine.set_parameters(self.path)
+        stats = unscented(self.engine, self.std)
+        self.logger.record("robustness/docked", stats["docked"])
+        self.logger.record("robustness/dv_mean", stats["dv_mean"])
+        self.logger.record("robustness/dv_std", stats["dv_std"])
+        self.logger.record(
+            "robustness/pos_std", float(np.sqrt(np.trace(stats["pos_cov"])))
+        )
+        self.logger.record(
+            "robustness/vel_std", float(np.sqrt(np.trace(stats["vel_cov"])))
+        )
+
+    def _on_training_end(self):
+        self.engine.close()
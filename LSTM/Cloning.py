@@ -0,0 +1,163 @@
+# Import libraries
+import os
+import sys
+import numpy as np
+import torch
+from MonteCarloEngine import MonteCarloEngine, worker_state
+from Sampling import FixedSampler
+from Scenario import make_env
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ExtraCode"))
+
+
+def cached_solutions(cache, ocp_kwargs=None, solve_kwargs=None):
+    """
+    Converged solutions of an OcpCache
+    :param cache: OcpCache
+    :param ocp_kwargs: Arguments of build_ocp, None with solve_kwargs for every problem
+    :param solve_kwargs: Arguments of solve_ocp
+    :return: List of solutions
+    """
+    from OcpCache import problem_key
+
+    if ocp_kwargs is None and solve_kwargs is None:
+        sols = [sol for problem in cache.solutions.values() for sol in problem]
+    else:
+        sols = cache.solutions.get(problem_key(ocp_kwargs, solve_kwargs), [])
+    return [sol for sol in sols if sol["converged"]]
+
+
+def demonstration(env, sol):
+    """
+    Replay an OCP solution in the environment from its initial state, nominal
+    thrust, until its time of flight (OSS: observations are the ones of the
+    environment, reward and thrust channels included)
+    :param env: Environment
+    :param sol: OCP solution with x00
+    :return: Scaled observations n x 16, actions n x 3
+    """
+    from Controllers import thrust_to_action
+    from OcpProblem import thrust_profile
+
+    env.sampler = FixedSampler([sol["x00"] - env.state0[0:13]], [4])
+    obs = env.reset()
+    env.sampler = None
+    thrust = thrust_profile(sol)
+    obs_vec, actions = [], []
+    elapsed = env.dt / 2 * env.t_star  # OSS: thrust at the middle of the step
+    while elapsed <= sol["tof"]:
+        action = thrust_to_action(
+            env, [np.interp(elapsed, sol["t"], thrust[:, i]) for i in range(3)]
+        )
+        obs_vec.append(obs)
+        actions.append(action)
+        obs, rewards, done, info = env.step(action)
+        if done:
+            break
+        elapsed += env.dt * env.t_star
+
+    return np.array(obs_vec), np.array(actions)
+
+
+def _demonstration_task(task):
+    env, _ = worker_state()
+    return demonstration(env, task["sol"])
+
+
+def demonstrations(sols, env_fn=make_env, n_workers=8):
+    """
+    Dataset of (observation, optimal action) pairs, one replay per worker task
+    :param sols: OCP solutions with x00
+    :param env_fn: Picklable callable returning the environment
+    :param n_workers: Number of processes
+    :return: Dictionary with obs n x 16, actions n x 3 and episode_starts n
+    """
+    # OSS: no policy on the workers, the OCP is the expert
+    with MonteCarloEngine(env_fn, {}, n_workers=n_workers) as engine:
+        demos = engine.map(_demonstration_task, [{"sol": sol} for sol in sols])
+    demos = [(obs, actions) for obs, actions in demos if len(obs)]
+    starts = [np.arange(len(obs)) == 0 for obs, _ in demos]
+
+    return {
+        "obs": np.concatenate([obs for obs, _ in demos]),
+        "actions": np.concatenate([actions for _, actions in demos]),
+        "episode_starts": np.concatenate(starts),
+    }
+
+
+def save_dataset(path, dataset):
+    np.savez(path, **dataset)
+
+
+def load_dataset(path):
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def pretrain(model, dataset, epochs=50, batch_size=64, learning_rate=1e-3, max_grad_norm=0.5):
+    """
+    Behaviour cloning of the SB3 actor: mean squared error between the mean
+    action of the policy and the expert action, on the labelled states only.
+    RecurrentPPO policies are fed whole episodes from zero LSTM states, PPO
+    policies random minibatches (OSS: the critic and the log standard
+    deviation are not trained)
+    :param model: SB3 PPO or RecurrentPPO model
+    :param dataset: Dictionary returned by demonstrations, with an optional
+        labelled mask (all labelled if missing)
+    :param epochs: Number of passes over the dataset
+    :param batch_size: Minibatch size of PPO policies
+    :param learning_rate: Learning rate of Adam
+    :param max_grad_norm: Gradient clipping
+    :return: Mean loss per epoch
+    """
+    policy = model.policy
+    device = policy.device
+    obs = torch.as_tensor(dataset["obs"], dtype=torch.float32, device=device)
+    actions = torch.as_tensor(dataset["actions"], dtype=torch.float32, device=device)
+    starts = torch.as_tensor(dataset["episode_starts"], dtype=torch.float32, device=device)
+    mask = torch.as_tensor(
+        dataset.get("labelled", np.ones(len(obs), dtype=bool)),
+        dtype=torch.float32,
+        device=device,
+    )
+    recurrent = hasattr(policy, "lstm_actor")
+    bounds = np.append(np.flatnonzero(dataset["episode_starts"]), len(obs))
+    optimizer = torch.optim.Adam(policy.parameters(), lr=learning_rate)
+
+    def action_mean(batch):
+        if recurrent:
+            states = tuple(
+                torch.zeros(policy.lstm_hidden_state_shape, device=device) for _ in range(2)
+            )
+            dist, _ = policy.get_distribution(obs[batch], states, starts[batch])
+        else:
+            dist = policy.get_distribution(obs[batch])
+        return dist.distribution.mean
+
+    policy.set_training_mode(True)
+    losses = []
+    for epoch in range(epochs):
+        if recurrent:
+            batches = [
+                slice(bounds[i], bounds[i + 1])
+                for i in np.random.permutation(len(bounds) - 1)
+            ]
+        else:
+            perm = np.random.permutation(len(obs))
+            batches = [perm[i : i + batch_size] for i in range(0, len(obs), batch_size)]
+        epoch_losses = []
+        for batch in batches:
+            if mask[batch].sum() == 0:
+                continue
+            error = torch.mean((action_mean(batch) - actions[batch]) ** 2, dim=1)
+            loss = torch.sum(mask[batch] * error) / mask[batch].sum()
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(policy.parameters(), max_grad_norm)
+            optimizer.step()
+            epoch_losses.append(loss.item())
+        losses.append(np.mean(epoch_losses))
+        print("Behaviour cloning epoch %d, loss %.4e" % (epoch + 1, losses[-1]))
+    policy.set_training_mode(False)
+
+    return losses
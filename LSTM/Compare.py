@@ -0,0 +1,216 @@
+# Import libraries
+import csv
+import os
+import sys
+import numpy as np
+from MonteCarloEngine import Isp, g0, mean_interval
+from Scenario import make_env
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ExtraCode"))
+
+
+def make_lqr(env_fn=make_env, **kwargs):
+    """
+    LQR controller of ExtraCode/LQR.py on the scenario
+    :param env_fn: Callable returning the environment (scalers and thrust bound)
+    :param kwargs: Arguments of LqrController
+    :return: Controller
+    """
+    from Controllers import LqrController
+
+    return LqrController(env_fn(), **kwargs)
+
+
+def make_lqr_schedule(path="lqr_schedule.npz", env_fn=make_env, **kwargs):
+    """
+    Time-varying LQR controller with the gain table of periodic_riccati
+    :param path: Saved gain schedule
+    :param env_fn: Callable returning the environment (scalers and thrust bound)
+    :param kwargs: Arguments of ScheduledLqrController
+    :return: Controller
+    """
+    from GainSchedule import ScheduledLqrController, load_schedule
+
+    return ScheduledLqrController(env_fn(), load_schedule(path), **kwargs)
+
+
+def make_ocp(env_fn=make_env, cache_path=None, **kwargs):
+    """
+    Open-loop OCP controller of ExtraCode/OCPmcm.py on the scenario
+    :param env_fn: Callable returning the environment (scalers and thrust bound)
+    :param cache_path: OcpCache pickle file loaded by the worker, None to solve cold
+    :param kwargs: Arguments of OcpController
+    :return: Controller
+    """
+    from Controllers import OcpController
+    from OcpCache import OcpCache
+
+    if cache_path is not None:
+        kwargs["cache"] = OcpCache(cache_path)
+    return OcpController(env_fn(), **kwargs)
+
+
+def merge_ocp_solutions(results, cache):
+    """
+    Merge the OCP solutions found by the workers into the cache of the parent
+    process and save it
+    :param results: List of episode results
+    :param cache: OcpCache
+    :return: Number of new solutions
+    """
+    n_new = cache.merge(
+        [new for r in results for new in r.pop("ocp_solutions", [])]
+    )
+    cache.save()
+    return n_new
+
+
+def make_mpc(env_fn=make_env, **kwargs):
+    """
+    Receding-horizon MPC controller on the scenario
+    :param env_fn: Callable returning the environment (scalers and thrust bound)
+    :param kwargs: Arguments of MpcController (horizon, k...)
+    :return: Controller
+    """
+    from Mpc import MpcController
+
+    return MpcController(env_fn(), **kwargs)
+
+
+def optimality_gaps(paired, reference="OCP", key="dv"):
+    """
+    Per-episode gaps of every controller w.r.t. the reference, on the episodes
+    docked by both
+    :param paired: Dictionary of episode results per policy, from run_paired
+    :param reference: Name of the reference policy
+    :param key: Episode result compared
+    :return: Dictionary per policy with absolute and relative gaps and statistics
+    """
+    ref = paired[reference]
+    gaps = {}
+    for name, results in paired.items():
+        if name == reference:
+            continue
+        both = [
+            (r[key], q[key])
+            for r, q in zip(results, ref)
+            if r["docked"] and q["docked"]
+        ]
+        if not both:
+            gaps[name] = {"episodes": 0}
+            continue
+        value, value_ref = np.array(both).T
+        gap = value - value_ref
+        mean, std, hw = mean_interval(gap)
+        gaps[name] = {
+            "gap": gap,
+            "relative": gap / value_ref,
+            "mean": mean,
+            "std": std,
+            "hw": hw,
+            "episodes": len(gap),
+        }
+
+    return gaps
+
+
+def cached_gaps(results, cache, ocp_kwargs=None, solve_kwargs=None, n_workers=1):
+    """
+    Optimality gaps of a campaign w.r.t. the OCP solutions of its initial
+    conditions, taken from the cache and solved only when missing
+    :param results: List of episode results
+    :param cache: OcpCache
+    :param ocp_kwargs: Arguments of build_ocp
+    :param solve_kwargs: Arguments of solve_ocp
+    :param n_workers: Number of processes for the missing solutions
+    :return: Dictionary with per-episode gaps on the episodes docked with a converged OCP
+    """
+    from OcpProblem import solve_campaign
+
+    sols = solve_campaign(
+        [r["x0"] for r in results],
+        n_workers=n_workers,
+        ocp_kwargs=ocp_kwargs,
+        solve_kwargs=solve_kwargs,
+        cache=cache,
+    )
+    pairs = [
+        (r["index"], r["dv"], Isp * g0 * np.log(sol["x"][0, 12] / sol["x"][-1, 12]))
+        for r, sol in zip(results, sols)
+        if r["docked"] and sol["converged"]
+    ]  # OSS: same specific impulse of the episode DV
+    if not pairs:
+        return {"episodes": 0}
+    index, dv, dv_ocp = np.array(pairs).T
+    gap = dv - dv_ocp
+    mean, std, hw = mean_interval(gap)
+
+    return {
+        "index": index.astype(int),
+        "dv_ocp": dv_ocp,
+        "gap": gap,
+        "relative": gap / dv_ocp,
+        "mean": mean,
+        "std": std,
+        "hw": hw,
+        "episodes": len(gap),
+    }
+
+
+def degradation(paired, reference="CRTBP", keys=("dv", "posfin", "velfin")):
+    """
+    Paired degradation of every dynamics model w.r.t. the reference one, on
+    the same seeded episodes
+    :param paired: Dictionary of episode results per dynamics model, from run_paired
+    :param reference: Name of the reference dynamics model
+    :param keys: Episode results compared
+    :return: Dictionary per model with success drop, lost dockings and mean
+        differences with half-widths
+    """
+    ref = paired[reference]
+    docked_ref = np.array([q["docked"] for q in ref])
+    metrics = {}
+    for name, results in paired.items():
+        if name == reference:
+            continue
+        docked = np.array([r["docked"] for r in results])
+        metrics[name] = {
+            "success_drop": docked_ref.mean() - docked.mean(),
+            "lost_dockings": int(np.sum(docked_ref & ~docked)),
+            "new_dockings": int(np.sum(~docked_ref & docked)),
+            "episodes": len(results),
+        }
+        for key in keys:
+            diff = np.array([r[key] - q[key] for r, q in zip(results, ref)])
+            mean, std, hw = mean_interval(diff)
+            metrics[name][key] = diff
+            metrics[name][key + "_mean"] = mean
+            metrics[name][key + "_hw"] = hw
+
+    return metrics
+
+
+def write_paired(path, paired, keys=("outcome", "docked", "dv", "posfin", "velfin", "tof")):
+    """
+    Paired per-episode results, one row per episode and one column per policy
+    (or dynamics model) and result
+    :param path: CSV file
+    :param paired: Dictionary of episode results, from run_paired
+    :param keys: Episode results written
+    """
+    names = list(paired)
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ["index", "seed", "failure"]
+            + [
+                "%s_%s" % ("_".join(np.atleast_1d(name)), key)
+                for name in names
+                for key in keys
+            ]
+        )
+        for rows in zip(*paired.values()):
+            writer.writerow(
+                [rows[0]["index"], rows[0]["seed"], rows[0]["failure"]]
+                + [r[key] for r in rows for key in keys]
+            )
@@ -0,0 +1,175 @@
+# Import libraries
+from functools import partial
+import numpy as np
+from Cloning import pretrain
+from MonteCarloEngine import MonteCarloEngine, worker_state
+from Scenario import load_model, make_env
+
+
+def expert_action(env, expert, obs, episode_start, tof_grid=1.0):
+    """
+    Action of the expert at a visited state
+    :param env: Environment
+    :param expert: MpcController with k = 1 or OcpController
+    :param obs: Scaled observation
+    :param episode_start: True at the first state of the episode
+    :param tof_grid: Grid of the capped ToF bound [s] (OSS: few cache keys, so
+        that late states get cache hits and warm starts)
+    :return: Action, None if the expert has no label for the state
+    """
+    from Controllers import OcpController, thrust_to_action
+
+    if not isinstance(expert, OcpController):
+        # OSS: with k = 1 every call is a solve, warm-started from the previous state
+        action, _ = expert.predict(obs, episode_start=np.array([episode_start]))
+        return action
+
+    # OCP from the visited state, docking before the end of the episode
+    x = env.scaler_reverse_observation(obs)
+    ocp_kwargs = expert.ocp_kwargs
+    tof_min, tof_max = ocp_kwargs.get("tof_bounds", (20, 40))
+    remaining = np.floor(x[13] * env.t_star / tof_grid) * tof_grid
+    if remaining < tof_min:
+        return None
+    if remaining < tof_max:  # OSS: same cache key as the episode start otherwise
+        expert.ocp_kwargs = dict(ocp_kwargs, tof_bounds=(tof_min, float(remaining)))
+    try:
+        sol = expert.solve(x[0:13])
+    except RuntimeError as error:  # OSS: failed NLP, the state stays unlabelled
+        print("OCP expert failed: %s" % error)
+        return None
+    finally:
+        expert.ocp_kwargs = ocp_kwargs
+    if not sol["converged"]:
+        return None
+    elapsed = env.dt / 2 * env.t_star
+    thrust = [np.interp(elapsed, sol["t"], expert.thrust[:, i]) for i in range(3)]
+    return thrust_to_action(env, thrust)
+
+
+def _label_task(task):
+    env, expert = worker_state()
+    labels = [expert_action(env, expert, obs, i == 0) for i, obs in enumerate(task["obs"])]
+    solutions = expert.pop_new_solutions() if hasattr(expert, "pop_new_solutions") else []
+    return labels, solutions
+
+
+def aggregate(dataset, visited, labels):
+    """
+    Append labelled episodes to a dataset. Episodes are kept whole, so that
+    recurrent policies see every step, and states without a label are masked
+    out of the loss (OSS: not labelled with zero thrust)
+    :param dataset: Dictionary with obs, actions, episode_starts and labelled, None if empty
+    :param visited: Scaled observations, one array per episode
+    :param labels: Expert actions or None, one list per episode
+    :return: Aggregated dataset
+    """
+    obs_vec, actions, starts, labelled = [], [], [], []
+    for obs, episode_labels in zip(visited, labels):
+        mask = np.array([action is not None for action in episode_labels])
+        if not mask.any():
+            continue
+        obs_vec.append(obs)
+        actions.append(
+            np.array(
+                [np.zeros(3) if action is None else action for action in episode_labels]
+            )
+        )
+        starts.append(np.arange(len(obs)) == 0)
+        labelled.append(mask)
+    if not obs_vec:
+        return dataset
+    new = {
+        "obs": np.concatenate(obs_vec),
+        "actions": np.concatenate(actions),
+        "episode_starts": np.concatenate(starts),
+        "labelled": np.concatenate(labelled),
+    }
+    if dataset is None:
+        return new
+    dataset = dict(dataset)
+    dataset.setdefault("labelled", np.ones(len(dataset["obs"]), dtype=bool))
+    return {key: np.concatenate((dataset[key], new[key])) for key in new}
+
+
+def dagger(
+    model,
+    path,
+    expert_fn,
+    dataset=None,
+    iterations=10,
+    n_episodes=32,
+    n_workers=8,
+    env_fn=make_env,
+    recurrent=True,
+    epochs=20,
+    seed=0,
+    cache=None,
+):
+    """
+    DAgger: the current policy is rolled out on the workers, the expert labels
+    the visited states in parallel (one task per episode), the dataset is
+    aggregated and the actor is retrained on all of it
+    :param model: SB3 PPO or RecurrentPPO model
+    :param path: Checkpoint path, loaded by the rollout workers
+    :param expert_fn: Picklable callable returning the expert
+    :param dataset: Initial dataset (e.g. behaviour cloning), None if empty
+    :param iterations: Number of DAgger iterations
+    :param n_episodes: Rollouts per iteration
+    :param n_workers: Number of processes
+    :param env_fn: Picklable callable returning the environment
+    :param recurrent: True for RecurrentPPO, False for PPO
+    :param epochs: Training epochs per iteration
+    :param seed: Seed of the rollouts
+    :param cache: OcpCache of the parent process, to save the solutions of the experts
+    :return: Aggregated dataset and statistics per iteration
+    """
+    env = env_fn()
+    history = []
+    with MonteCarloEngine(env_fn, expert_fn, n_workers=n_workers) as experts:
+        for iteration in range(iterations):
+            # Rollouts of the current policy (OSS: workers re-load the checkpoint)
+            model.save(path)
+            with MonteCarloEngine(
+                env_fn,
+                partial(load_model, path, recurrent),
+                n_workers=n_workers,
+                seed=seed,
+                record=True,
+            ) as engine:
+                results = engine.run(n_episodes, start=iteration * n_episodes)
+            visited = [env.scaler_apply_observation(r["obs"][:-1]) for r in results]
+
+            # Expert labels, aggregation and training
+            labelled = experts.map(_label_task, [{"obs": obs} for obs in visited])
+            labels = [episode_labels for episode_labels, _ in labelled]
+            if cache is not None:
+                cache.merge([new for _, solutions in labelled for new in solutions])
+                cache.save()
+            dataset = aggregate(dataset, visited, labels)
+            if dataset is None:
+                print("DAgger iteration %d: no labelled states" % (iteration + 1))
+                continue
+            losses = pretrain(model, dataset, epochs=epochs)
+            history.append(
+                {
+                    "iteration": iteration,
+                    "docked": np.mean([r["docked"] for r in results]),
+                    "dv": np.mean([r["dv"] for r in results]),
+                    "pairs": int(np.sum(dataset["labelled"])),
+                    "loss": losses[-1],
+                }
+            )
+            print(
+                "DAgger iteration %d: docked %.1f %%, DV %.3f m/s, %d pairs, loss %.4e"
+                % (
+                    iteration + 1,
+                    history[-1]["docked"] * 100,
+                    history[-1]["dv"],
+                    history[-1]["pairs"],
+                    history[-1]["loss"],
+                )
+            )
+    model.save(path)
+
+    return dataset, history
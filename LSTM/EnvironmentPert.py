@@ -19,6 +19,7 @@ class ArpodCrtbp(gym.Env):
         ang_corr=np.rad2deg(15),
         safety_radius=1,
         safety_vel=0.1,
+        sampler=None,
     ):
         super(ArpodCrtbp, self).__init__()
         # DATA
@@ -41,11 +42,10 @@ class ArpodCrtbp(gym.Env):
         self.infos = {"Episode success": "lost"}
         self.done = False
         self.Told = np.zeros(3)
-        self.randomc = random.choice([1, 2, 3, 4])
-        self.randomT = np.ones(3)
         self.failure = 0.5
-        if self.randomc != 4:
-            self.randomT[self.randomc - 1] = self.failure
+        self.failure_modes = [1, 2, 3, 4]  # OSS: 50% thrust on x, y, z or nominal
+        self.sampler = sampler  # OSS: None for plain random sampling
+        self.set_failure_mode(random.choice(self.failure_modes))
 
         # STATE AND ACTION SPACES
         self.action_space = spaces.Box(low=-1, high=1, shape=(3,), dtype=np.float32)
@@ -293,11 +293,15 @@ class ArpodCrtbp(gym.Env):
 
     # Reset between episodes
     def reset(self):
-        # Random thrust failure
-        self.randomc = random.choice([1, 2, 3, 4])
-        self.randomT = np.ones(3)
-        if self.randomc != 4:
-            self.randomT[self.randomc - 1] = self.failure
+        # Random thrust failure and initial conditions
+        if self.sampler is None:
+            self.set_failure_mode(random.choice(self.failure_modes))
+            state = np.random.normal(self.state0, self.state0_std).flatten()
+        else:
+            state, mode = self.sampler.sample(
+                self.state0, self.state0_std, self.failure_modes
+            )
+            self.set_failure_mode(mode)
 
         # Miscellaneous
         self.infos = {"Episode success": "lost"}
@@ -306,12 +310,19 @@ class ArpodCrtbp(gym.Env):
 
         # Set initial conditions (OSS: already normalized)
         print("New initial condition")
-        self.state = np.random.normal(self.state0, self.state0_std).flatten()
+        self.state = state
         self.reward_old = self.get_reward(np.array([0, 0, 0]))
         self.state = self.scaler_apply_observation(self.state)
 
         return self.state
 
+    # Thrust failure: 50% thrust in one direction, mode 4 is nominal
+    def set_failure_mode(self, mode):
+        self.randomc = mode
+        self.randomT = np.ones(3)
+        if self.randomc != 4:
+            self.randomT[self.randomc - 1] = self.failure
+
     def get_reward(self, T):
         # Useful data
         xrel_new = self.state[6:-4]
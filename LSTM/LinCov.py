@@ -0,0 +1,214 @@
+# Import libraries
+import numpy as np
+import torch
+from MonteCarloEngine import restore, snapshot
+from Sampling import FixedSampler
+
+# DATA
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+n_ivp = 13  # OSS: target, relative state and mass
+
+
+def policy_jacobian(model, obs, lstm_states=None, episode_start=True):
+    """
+    Jacobian of the deterministic action w.r.t. the scaled observation, via
+    autograd (OSS: LSTM states are frozen on the nominal trajectory)
+    :param model: SB3 PPO or RecurrentPPO model
+    :param obs: Scaled observation
+    :param lstm_states: LSTM states returned by predict, None at episode start
+    :param episode_start: True at the first step of the episode
+    :return: Jacobian, 3 x 16
+    """
+    policy = model.policy
+    obs_t = torch.as_tensor(obs, dtype=torch.float32, device=policy.device)
+    recurrent = hasattr(policy, "lstm_actor")
+    if recurrent:
+        if lstm_states is None:
+            lstm_states = (
+                np.zeros(policy.lstm_hidden_state_shape),
+                np.zeros(policy.lstm_hidden_state_shape),
+            )
+        states = tuple(
+            torch.as_tensor(s, dtype=torch.float32, device=policy.device)
+            for s in lstm_states
+        )
+        starts = torch.as_tensor([float(episode_start)], device=policy.device)
+
+    def action_mean(o):
+        if recurrent:
+            dist, _ = policy.get_distribution(o[None], states, starts)
+        else:
+            dist = policy.get_distribution(o[None])
+        return dist.distribution.mean[0]
+
+    with torch.no_grad():
+        mean = action_mean(obs_t).cpu().numpy()
+    jac = torch.autograd.functional.jacobian(action_mean, obs_t).cpu().numpy()
+    jac[np.abs(mean) >= 1] = 0  # OSS: saturated actions are clipped by predict
+
+    return jac
+
+
+def fd_steps(env, pos=1.0, vel=1e-2, mass=1.0, target_pos=100.0, target_vel=1e-2):
+    """
+    Finite differences steps of the scaled state, from physical ones well above
+    the tolerance of the integrator (OSS: 2.2e-14 adimensional is about 1e-5 m)
+    :param env: Environment
+    :param pos: Step of the relative position [m]
+    :param vel: Step of the relative velocity [m/s]
+    :param mass: Step of the mass [kg]
+    :param target_pos: Step of the target position [m]
+    :param target_vel: Step of the target velocity [m/s]
+    :return: Steps of the scaled state, 13
+    """
+    v_star = env.l_star / env.t_star
+    steps = np.concatenate(
+        (
+            target_pos / env.l_star * np.ones(3),
+            target_vel / v_star * np.ones(3),
+            pos / env.l_star * np.ones(3),
+            vel / v_star * np.ones(3),
+            [mass / env.m_star],
+        )
+    )
+    return steps * (2 / (env.max - env.min))[0:n_ivp]
+
+
+def step_jacobian(env, snap, action, steps=None, action_step=1e-4, check_tol=None):
+    """
+    Jacobians of one environment step w.r.t. scaled state and action, by
+    central finite differences on the integrator
+    :param env: Environment
+    :param snap: Snapshot of the environment before the step
+    :param action: Nominal action
+    :param steps: Steps of the scaled state, fd_steps if None
+    :param action_step: Step of the action
+    :param check_tol: Relative tolerance of the check against halved steps, None to skip it
+    :return: Jacobians 13 x 13 and 13 x 3
+    """
+
+    def propagate(state, a):
+        restore(env, dict(snap, state=state))
+        obs, _, _, _ = env.step(a)
+        return obs[0:n_ivp]
+
+    def jacobians(h_s, h_a):
+        state = snap["state"]
+        G_s = np.zeros((n_ivp, n_ivp))
+        G_a = np.zeros((n_ivp, 3))
+        for j in range(n_ivp):
+            dp = np.zeros(len(state))
+            dp[j] = h_s[j]
+            G_s[:, j] = (
+                propagate(state + dp, action) - propagate(state - dp, action)
+            ) / (2 * h_s[j])
+        for j in range(3):
+            da = np.zeros(3)
+            da[j] = h_a
+            G_a[:, j] = (
+                propagate(state, action + da) - propagate(state, action - da)
+            ) / (2 * h_a)
+        return G_s, G_a
+
+    steps = fd_steps(env) if steps is None else np.asarray(steps)
+    G_s, G_a = jacobians(steps, action_step)
+    if check_tol is not None:
+        G_s2, G_a2 = jacobians(steps / 2, action_step / 2)
+        error = max(
+            np.linalg.norm(G_s2 - G_s) / np.linalg.norm(G_s2),
+            np.linalg.norm(G_a2 - G_a) / np.linalg.norm(G_a2),
+        )
+        if error > check_tol:
+            print("Finite differences: relative change %.2e with halved steps" % error)
+
+    return G_s, G_a
+
+
+def lincov(env, model, failure_mode=4, steps=None, action_step=1e-4, check_tol=1e-3):
+    """
+    Linear covariance analysis of the closed loop: the initial dispersion and
+    the dynamics noise are propagated along the nominal trajectory with the
+    linearized dynamics and policy (OSS: time, thrust and reward observations
+    are held at their nominal values)
+    :param env: Environment
+    :param model: SB3 PPO or RecurrentPPO model
+    :param failure_mode: Thrust failure mode of the nominal trajectory
+    :param steps: Finite differences steps of the scaled state, fd_steps if None
+    :param action_step: Finite differences step of the action
+    :param check_tol: Tolerance of the halved-step check, done at the first step
+    :return: Dictionary with time [s], nominal observations and covariances
+    """
+    # Nominal trajectory without dispersion and noise
+    dyn_uncertainty = getattr(env, "dyn_uncertainty", 0.0)
+    sampler = env.sampler
+    env.dyn_uncertainty = 0.0
+    env.sampler = FixedSampler(np.zeros((1, n_ivp)), [failure_mode])
+    obs = env.reset()
+    env.sampler = sampler
+
+    # Initial covariance in scaled coordinates
+    D = (2 / (env.max - env.min))[0:n_ivp]
+    P = np.diag((D * env.state0_std[0:n_ivp]) ** 2)
+
+    # Process noise: uniform accelerations on the relative velocity (OSS: variance of U(0, std))
+    acc_var = (dyn_uncertainty / (env.l_star / env.t_star**2)) ** 2 / 12
+    Q = np.zeros((n_ivp, n_ivp))
+    for i in range(3):
+        G = np.zeros(n_ivp)
+        G[6 + i] = D[6 + i] * env.dt**2 / 2
+        G[9 + i] = D[9 + i] * env.dt
+        Q += acc_var * np.outer(G, G)
+
+    # Propagation
+    lstm_states = None
+    done = True
+    P_vec = [P]
+    obs_vec = [env.scaler_reverse_observation(obs)]
+    while True:
+        snap = snapshot(env)
+        K = policy_jacobian(model, obs, lstm_states, done)[:, 0:n_ivp]
+        action, lstm_states = model.predict(
+            obs, state=lstm_states, episode_start=np.array([done]), deterministic=True
+        )
+        G_s, G_a = step_jacobian(
+            env, snap, action, steps, action_step, check_tol if len(P_vec) == 1 else None
+        )
+        restore(env, snap)
+        obs, rewards, done, info = env.step(action)
+
+        # Closed-loop covariance
+        Phi = G_s + G_a @ K
+        P = Phi @ P @ Phi.T + Q
+        P_vec.append(P)
+        obs_vec.append(env.scaler_reverse_observation(obs))
+        if done:
+            break
+    env.dyn_uncertainty = dyn_uncertainty
+
+    # Physical covariances
+    P_vec = np.array(P_vec) / np.outer(D, D)
+    pos_cov = P_vec[:, 6:9, 6:9] * l_star**2
+    vel_cov = P_vec[:, 9:12, 9:12] * (l_star / t_star) ** 2
+
+    return {
+        "t": np.arange(len(P_vec)) * env.dt * env.t_star,
+        "obs": np.array(obs_vec),
+        "P": P_vec,
+        "pos_cov": pos_cov,
+        "vel_cov": vel_cov,
+        "sigma_pos": np.sqrt(np.trace(pos_cov, axis1=1, axis2=2)),
+        "sigma_vel": np.sqrt(np.trace(vel_cov, axis1=1, axis2=2)),
+        "outcome": info.get("Episode success"),
+    }
+
+
+def ellipsoid(cov, n_sigma=3):
+    """
+    Dispersion ellipsoid of a 3 x 3 covariance
+    :param cov: Covariance
+    :param n_sigma: Number of standard deviations
+    :return: Semi-axes and directions (columns)
+    """
+    eigval, eigvec = np.linalg.eigh(cov)
+    return n_sigma * np.sqrt(np.maximum(eigval, 0)), eigvec
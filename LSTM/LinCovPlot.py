@@ -0,0 +1,33 @@
+# Import libraries
+import matplotlib.pyplot as plt
+from LinCov import lincov, ellipsoid
+from Scenario import make_env, load_model
+
+# LINEAR COVARIANCE ANALYSIS
+env = make_env()
+model = load_model("ppo_recurrentBest1B", True)
+lin = lincov(env, model, failure_mode=4)
+
+# Print Info
+axes, _ = ellipsoid(lin["pos_cov"][-1], n_sigma=3)
+print("Nominal outcome:", lin["outcome"])
+print("Final 3-sigma position ellipsoid semi-axes [m]:", axes)
+axes, _ = ellipsoid(lin["vel_cov"][-1], n_sigma=3)
+print("Final 3-sigma velocity ellipsoid semi-axes [m/s]:", axes)
+
+# Plot 3-sigma dispersion of relative position and velocity
+plt.close()
+plt.figure()
+plt.semilogy(lin["t"], 3 * lin["sigma_pos"], c="g", linewidth=2)
+plt.grid(True, which="both")
+plt.xlabel("Time [s]")
+plt.ylabel("$3\sigma$ Position [m]")
+plt.savefig("plots\LinCovPosition.pdf")  # Save
+
+plt.figure()
+plt.semilogy(lin["t"], 3 * lin["sigma_vel"], c="b", linewidth=2)
+plt.grid(True, which="both")
+plt.xlabel("Time [s]")
+plt.ylabel("$3\sigma$ Velocity [m/s]")
+plt.savefig("plots\LinCovVelocity.pdf")  # Save
+plt.show()
@@ -5,6 +5,7 @@ from Environment import ArpodCrtbp
 from stable_baselines3.common.env_checker import check_env
 import matplotlib.pyplot as plt
 import time
+from Stability import stack_episodes, lyapunov, violation_stats
 
 # DEFINITIONS
 # Data and initialization
@@ -88,6 +89,7 @@ print(model.policy)
 num_episode_MCM = 500
 num_ep = 0
 docked = np.zeros(num_episode_MCM)
+obs_campaign = []
 dt_cost = 0
 posfin_mean, posfin_std = 0, 0
 velfin_mean, velfin_std = 0, 0
@@ -135,25 +137,8 @@ for num_ep in range(num_episode_MCM):
         if done:
             break
 
-    # Lyapunov function
-    omega = 2.91 + 1e-6
-    position = obs_vec[1:, 6:9] * l_star
-    velocity = obs_vec[1:, 9:12] * l_star / t_star
-    t = np.linspace(0, len(obs_vec) * dt, len(obs_vec))[1:]
-    rho, rhodot, V, dVdT = (
-        np.zeros(len(t) - 1),
-        np.zeros(len(t) - 1),
-        np.zeros(len(t) - 1),
-        np.zeros(len(t[0:-1])),
-    )
-
-    for i in range(len(t) - 1):
-        rho[i] = np.linalg.norm(position[i])
-        rhodot[i] = np.linalg.norm(velocity[i])
-        V[i] = 0.5 * (rho[i] ** 2 + rhodot[i] ** 2)
-    V = V - V[-1]
-    for i in range(len(t) - 2):
-        dVdT[i] = (V[i + 1] - V[i]) / dt
+    # Saving for stability analysis
+    obs_campaign.append(obs_vec)
 
     # Plot Trajectory
     plt.figure(1)
@@ -167,28 +152,6 @@ for num_ep in range(num_episode_MCM):
         linewidth=1.5,
     )
 
-    # Plot V
-    plt.figure(2)
-    plt.plot(
-        (rho**2 + rho**2),
-        V,
-        c=np.random.rand(
-            3,
-        ),
-        linewidth=2,
-    )
-
-    # Plot Vdot
-    plt.figure(3)
-    plt.plot(
-        (rho**2 + rho**2),
-        dVdT,
-        c=np.random.rand(
-            3,
-        ),
-        linewidth=2,
-    )
-
     # DV and ToF Computation
     dv = Isp * g0 * np.log(obs_vec[0, 12] / obs_vec[-1, 12])
     ToF = len(obs_vec) * dt
@@ -247,6 +210,39 @@ for num_ep in range(num_episode_MCM):
             ]
         )
 
+# Lyapunov function (OSS: whole campaign at once)
+campaign, lengths = stack_episodes(obs_campaign)
+rho, rhodot, V, dVdT = lyapunov(campaign, lengths, dt)
+stability = violation_stats(dVdT)
+print(
+    "Fraction of steps with dV/dt > 0 mean and standard deviation:",
+    stability["fraction_mean"],
+    ",",
+    stability["fraction_std"],
+)
+print("Episodes with dV/dt > 0:", stability["episodes_violated"] * 100, "%")
+
+# Plot V and Vdot
+for i in range(len(obs_campaign)):
+    plt.figure(2)
+    plt.plot(
+        (rho[i] ** 2 + rho[i] ** 2),
+        V[i],
+        c=np.random.rand(
+            3,
+        ),
+        linewidth=2,
+    )
+    plt.figure(3)
+    plt.plot(
+        (rho[i] ** 2 + rho[i] ** 2),
+        dVdT[i],
+        c=np.random.rand(
+            3,
+        ),
+        linewidth=2,
+    )
+
 # Re-scaling and other Statistics
 posfin_mean = posfin_mean * l_star
 posfin_std = posfin_std * l_star
@@ -0,0 +1,43 @@
+# Import libraries
+from functools import partial
+from MonteCarloEngine import MonteCarloEngine
+from Scenario import make_env, load_model
+
+# TESTING with sequential MCM
+if __name__ == "__main__":
+    # Campaign stopped on confidence intervals (OSS: 95% confidence)
+    with MonteCarloEngine(
+        make_env,
+        partial(load_model, "ppo_recurrentBest1B", True),
+        n_workers=8,
+        seed=0,
+        store="campaign_adaptive.jsonl",  # OSS: re-launch to resume
+    ) as engine:
+        results, summary = engine.run_adaptive(
+            hw_success=0.02,
+            hw_dv=0.05,
+            hw_posfin=0.05,
+            hw_velfin=0.005,
+            batch_size=40,
+            min_episodes=40,
+            max_episodes=500,
+        )
+
+    # Print Info
+    print("Converged:", summary["converged"], "after", summary["episodes"], "episodes")
+    print(
+        "S_r: %.1f %%, 95%% CI [%.1f %%, %.1f %%]"
+        % (
+            summary["success"] * 100,
+            summary["success_ci"][0] * 100,
+            summary["success_ci"][1] * 100,
+        )
+    )
+    print("DV mean and standard deviation:", summary["dv_mean"], ",", summary["dv_std"])
+    print(
+        "Final position and velocity mean:",
+        summary["posfin_mean"],
+        ",",
+        summary["velfin_mean"],
+    )
+    print("ToF mean and standard deviation:", summary["tof_mean"], ",", summary["tof_std"])
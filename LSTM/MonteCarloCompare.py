@@ -0,0 +1,84 @@
+# Import libraries
+import os
+from functools import partial
+import numpy as np
+import matplotlib.pyplot as plt
+from Compare import (
+    make_lqr,
+    make_lqr_schedule,
+    make_mpc,
+    make_ocp,
+    merge_ocp_solutions,
+    optimality_gaps,
+    write_paired,
+)
+from MonteCarloEngine import MonteCarloEngine, summarize
+from Scenario import dt, x0ivp_vec, make_env, load_model
+
+# Controllers (OSS: same seeded initial conditions and failure modes for all)
+ocp_cache_path = "../ExtraCode/ocp_cache.pkl"
+policies = {
+    "LSTM": partial(load_model, "ppo_recurrentBest1B", True),
+    "MLP": partial(load_model, "../MLP/ppo_mlp", False),
+    "LQR": make_lqr,
+    "TV-LQR": make_lqr_schedule,
+    "OCP": partial(make_ocp, cache_path=ocp_cache_path),
+    "MPC": partial(make_mpc, horizon=20, k=2),
+}
+
+# TESTING with paired MCM
+if __name__ == "__main__":
+    # Periodic gain schedule along the NRO, computed once
+    if not os.path.exists("lqr_schedule.npz"):
+        from GainSchedule import periodic_riccati, save_schedule
+
+        save_schedule("lqr_schedule.npz", periodic_riccati(x0ivp_vec[0:6]))
+
+    with MonteCarloEngine(make_env, policies, n_workers=8, seed=0) as engine:
+        paired = engine.run_paired(100)
+    from OcpCache import OcpCache
+
+    n_new = merge_ocp_solutions(paired["OCP"], OcpCache(ocp_cache_path))
+    print("New OCP solutions saved to the cache:", n_new)
+    write_paired("compare.csv", paired)
+
+    # Print Info
+    for name, results in paired.items():
+        summary = summarize(results)
+        print(
+            "%s: S_r %.1f %% +- %.1f %%, DV %.3f +- %.3f m/s"
+            % (
+                name,
+                summary["success"] * 100,
+                summary["success_hw"] * 100,
+                summary["dv_mean"],
+                summary["dv_hw"],
+            )
+        )
+    latency = [t for r in paired["MPC"] for t in r["latency"]]
+    print(
+        "MPC solve latency: mean %.3f s, 99th percentile %.3f s, max %.3f s (step %.1f s)"
+        % (
+            np.mean(latency),
+            np.percentile(latency, 99),
+            np.max(latency),
+            dt,
+        )
+    )
+    gaps = optimality_gaps(paired, reference="OCP")
+    for name, gap in gaps.items():
+        if gap["episodes"]:
+            print(
+                "%s: DV gap w.r.t. OCP %.3f +- %.3f m/s (%d paired episodes)"
+                % (name, gap["mean"], gap["hw"], gap["episodes"])
+            )
+
+    # Plot
+    names = [name for name in gaps if gaps[name]["episodes"]]
+    plt.figure()
+    plt.violinplot([gaps[name]["gap"] for name in names], showmeans=True)
+    plt.xticks(range(1, len(names) + 1), names)
+    plt.grid(True)
+    plt.ylabel("$\Delta V - \Delta V_{OCP}$ [m/s]")
+    plt.savefig("plots\Compare.pdf")
+    plt.show()
@@ -0,0 +1,51 @@
+# Import libraries
+from functools import partial
+from Compare import degradation, write_paired
+from MonteCarloEngine import MonteCarloEngine, summarize
+from Scenario import make_env, make_env_pert, load_model
+
+# Dynamics models (OSS: policy trained on the CRTBP, same seeds for all)
+models = {"CRTBP": make_env, "BRFBP+SRP": make_env_pert}
+
+# TESTING with cross-fidelity MCM
+if __name__ == "__main__":
+    with MonteCarloEngine(
+        models,
+        partial(load_model, "ppo_recurrentBest1B", True),
+        n_workers=8,
+        seed=0,
+    ) as engine:
+        paired = engine.run_paired(100)
+    write_paired("cross_fidelity.csv", paired)
+
+    # Print Info
+    for name, results in paired.items():
+        summary = summarize(results)
+        print(
+            "%s: S_r %.1f %% +- %.1f %%, DV %.3f +- %.3f m/s"
+            % (
+                name,
+                summary["success"] * 100,
+                summary["success_hw"] * 100,
+                summary["dv_mean"],
+                summary["dv_hw"],
+            )
+        )
+    for name, metrics in degradation(paired, reference="CRTBP").items():
+        print(
+            "%s w.r.t. CRTBP: S_r drop %.1f %% (%d dockings lost, %d gained), "
+            "DV %+.3f +- %.3f m/s, final position %+.3f +- %.3f m, "
+            "final velocity %+.4f +- %.4f m/s"
+            % (
+                name,
+                metrics["success_drop"] * 100,
+                metrics["lost_dockings"],
+                metrics["new_dockings"],
+                metrics["dv_mean"],
+                metrics["dv_hw"],
+                metrics["posfin_mean"],
+                metrics["posfin_hw"],
+                metrics["velfin_mean"],
+                metrics["velfin_hw"],
+            )
+        )
@@ -0,0 +1,771 @@
+# Import libraries
+import copy
+import json
+from functools import partial
+import multiprocessing
+import os
+import random
+import numpy as np
+from scipy import stats
+
+# DATA
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+Isp = 300
+g0 = 9.81
+
+# Worker state (OSS: one environment and one policy per process)
+_env = None
+_model = None
+_env_fn = None
+_batch_envs = {}  # OSS: extra environments of lockstep batches, per dynamics model
+_parameters = None  # OSS: version of the policy parameters loaded by the worker
+
+
+def _build(fn):
+    # OSS: a dictionary name: callable builds one object per name (controllers or dynamics)
+    if isinstance(fn, dict):
+        return {name: f() for name, f in fn.items()}
+    return fn()
+
+
+def _init_worker(env_fn, policy_fn):
+    global _env, _model, _env_fn, _parameters
+    _env = _build(env_fn)
+    _model = _build(policy_fn)
+    _env_fn = env_fn
+    _parameters = None
+    _batch_envs.clear()
+
+
+def _sync_parameters(model, parameters):
+    # Load new policy parameters (version, path) once per worker, in the live model
+    global _parameters
+    if parameters is not None and parameters != _parameters:
+        model.set_parameters(parameters[1], exact_match=True, device="cpu")
+        _parameters = parameters
+
+
+def _run_task(task):
+    task = dict(task)
+    name = task.pop("policy", None)
+    dynamics = task.pop("dynamics", None)
+    env = _env if dynamics is None else _env[dynamics]
+    model = _model if name is None else _model[name]
+    _sync_parameters(model, task.pop("parameters", None))
+    result = run_episode(env, model, **task)
+    if name is not None:
+        result["policy"] = name
+    if dynamics is not None:
+        result["dynamics"] = dynamics
+
+    return result
+
+
+def _run_batch_task(task):
+    name = task.get("policy")
+    dynamics = task.get("dynamics")
+    model = _model if name is None else _model[name]
+    _sync_parameters(model, task["episodes"][0].get("parameters"))
+    envs = _batch_envs.setdefault(
+        dynamics, [_env if dynamics is None else _env[dynamics]]
+    )
+    while len(envs) < len(task["episodes"]):
+        envs.append(_build(_env_fn if dynamics is None else _env_fn[dynamics]))
+    results = run_lockstep(envs[: len(task["episodes"])], model, task["episodes"])
+    for result in results:
+        if name is not None:
+            result["policy"] = name
+        if dynamics is not None:
+            result["dynamics"] = dynamics
+
+    return results
+
+
+def worker_state():
+    """
+    Environment and policy of the current worker
+    :return: Environment, policy
+    """
+    return _env, _model
+
+
+def snapshot(env):
+    """
+    Copy of the environment state, to restart an episode from it
+    :param env: Environment
+    :return: Dictionary of environment attributes
+    """
+    keys = ["state", "time", "reward_old", "randomc", "randomT", "done", "infos", "Told"]
+    return {key: copy.deepcopy(getattr(env, key)) for key in keys}
+
+
+def restore(env, snap):
+    """
+    Restart the environment from a snapshot
+    :param env: Environment
+    :param snap: Snapshot
+    :return: Scaled observation
+    """
+    for key, value in snap.items():
+        setattr(env, key, copy.deepcopy(value))
+    return env.state
+
+
+def describe(obj):
+    """
+    JSON description of a policy, environment or sampler, stable across runs
+    (OSS: functions by name, partials by arguments, objects by public attributes)
+    :param obj: Callable, dictionary of callables or sampler
+    :return: JSON-serializable description
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, dict):
+        return {str(key): describe(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [describe(value) for value in obj]
+    if isinstance(obj, partial):
+        return {
+            "function": describe(obj.func),
+            "args": describe(obj.args),
+            "kwargs": describe(obj.keywords),
+        }
+    if callable(obj) and hasattr(obj, "__qualname__"):
+        return "%s.%s" % (obj.__module__, obj.__qualname__)
+    attributes = {
+        key: value
+        for key, value in getattr(obj, "__dict__", {}).items()
+        if not key.startswith("_") and key not in ("index", "weight")  # OSS: run state
+    }
+    return {"class": type(obj).__name__, "attributes": describe(attributes)}
+
+
+def episode_seed(base_seed, index):
+    """
+    Seed of an episode, independent of the number of episodes of the campaign
+    :param base_seed: Seed of the campaign
+    :param index: Index of the episode
+    :return: Seed
+    """
+    seq = np.random.SeedSequence(base_seed, spawn_key=(index,))
+    return int(seq.generate_state(1)[0])
+
+
+def run_episode(
+    env, model, index=0, seed=None, record=False, sampler=None, failure_mode=None
+):
+    """
+    Propagate one closed-loop episode
+    :param env: Environment
+    :param model: Policy with SB3 predict interface
+    :param index: Index of the episode in the campaign
+    :param seed: Seed of initial conditions, thrust failure and dynamics noise
+    :param record: True to return the un-scaled observations
+    :param sampler: Initial-condition sampler, None for plain random sampling
+    :param failure_mode: Thrust failure mode, None to keep the sampled one
+    :return: Dictionary of episode results
+    """
+    # Initialization (OSS: the environment uses the global generators)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    env.sampler = sampler
+    if sampler is not None:
+        sampler.index = index  # OSS: point of the episode in the design
+    obs = env.reset()
+    if failure_mode is not None:
+        env.set_failure_mode(failure_mode)
+    obs_vec = [env.scaler_reverse_observation(obs)]
+    lstm_states = None
+    done = True
+    n_solves = len(getattr(model, "latency", []))  # OSS: optimization-based controllers
+
+    # Propagation
+    while True:
+        action, lstm_states = model.predict(
+            obs, state=lstm_states, episode_start=np.array([done]), deterministic=True
+        )  # OSS: Episode start signals are used to reset the lstm states
+        obs, rewards, done, info = env.step(action)
+        obs_vec.append(env.scaler_reverse_observation(obs))
+        if done:
+            break
+
+    result = _episode_result(env, index, seed, obs_vec, info, record)
+    if hasattr(model, "latency"):
+        result["latency"] = list(model.latency[n_solves:])
+    if hasattr(model, "pop_new_solutions"):
+        result["ocp_solutions"] = model.pop_new_solutions()  # OSS: merged by the parent
+
+    return result
+
+
+def run_lockstep(envs, model, tasks):
+    """
+    Propagate a batch of episodes in lockstep, with one batched predict per
+    step (OSS: the policy must accept n x 16 observations, as SB3 models and
+    LqrController). Every environment keeps its own global generator states,
+    so results are the same of run_episode with the same seeds
+    :param envs: Environments, one per episode
+    :param model: Policy with SB3 predict interface
+    :param tasks: Arguments of run_episode, one dictionary per episode
+    :return: List of episode results
+    """
+    # Initialization
+    n = len(tasks)
+    obs, obs_vec, infos, rng = [], [], [{} for _ in range(n)], []
+    for env, task in zip(envs, tasks):
+        if task.get("seed") is not None:
+            random.seed(task["seed"])
+            np.random.seed(task["seed"])
+        env.sampler = task.get("sampler")
+        if env.sampler is not None:
+            env.sampler.index = task.get("index", 0)
+        obs.append(env.reset())
+        if task.get("failure_mode") is not None:
+            env.set_failure_mode(task["failure_mode"])
+        obs_vec.append([env.scaler_reverse_observation(obs[-1])])
+        rng.append((random.getstate(), np.random.get_state()))
+    active = np.ones(n, dtype=bool)
+    episode_start = np.ones(n, dtype=bool)
+    lstm_states = None
+
+    # Propagation (OSS: ended episodes stay in the batch, their actions are ignored)
+    while np.any(active):
+        actions, lstm_states = model.predict(
+            np.array(obs), state=lstm_states, episode_start=episode_start, deterministic=True
+        )
+        episode_start = np.zeros(n, dtype=bool)
+        for i in np.flatnonzero(active):
+            random.setstate(rng[i][0])
+            np.random.set_state(rng[i][1])
+            obs[i], rewards, done, infos[i] = envs[i].step(actions[i])
+            rng[i] = (random.getstate(), np.random.get_state())
+            obs_vec[i].append(envs[i].scaler_reverse_observation(obs[i]))
+            active[i] = not done
+
+    return [
+        _episode_result(
+            env, task.get("index", 0), task.get("seed"), vec, info, task.get("record", False)
+        )
+        for env, task, vec, info in zip(envs, tasks, obs_vec, infos)
+    ]
+
+
+def _episode_result(env, index, seed, obs_vec, info, record):
+    # Results of an ended episode
+    obs_vec = np.array(obs_vec)
+    outcome = info.get("Episode success")
+    result = {
+        "index": index,
+        "seed": seed,
+        "failure": env.randomc,
+        "weight": 1.0 if env.sampler is None else env.sampler.weight,
+        "outcome": outcome,
+        "docked": outcome == "docked",
+        "posfin": np.linalg.norm(obs_vec[-1, 6:9]) * l_star,
+        "velfin": np.linalg.norm(obs_vec[-1, 9:12]) * l_star / t_star,
+        "dv": Isp * g0 * np.log(obs_vec[0, 12] / obs_vec[-1, 12]),
+        "x0": obs_vec[0, 0:13],  # OSS: adimensional initial state, as OCP x00
+        "xfin": np.concatenate(
+            (obs_vec[-1, 6:9] * l_star, obs_vec[-1, 9:12] * l_star / t_star)
+        ),
+        "tof": len(obs_vec) * env.dt * env.t_star,
+    }
+    if record:
+        result["obs"] = obs_vec
+
+    return result
+
+
+def wilson_interval(successes, n, confidence=0.95):
+    """
+    Wilson score interval of a success probability
+    :param successes: Number of successes
+    :param n: Number of trials
+    :param confidence: Confidence level
+    :return: Estimate, lower and upper bounds
+    """
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    p = successes / n
+    center = (p + z**2 / (2 * n)) / (1 + z**2 / n)
+    hw = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+    return p, center - hw, center + hw
+
+
+def mean_interval(x, confidence=0.95):
+    """
+    Student-t confidence interval of a mean
+    :param x: Samples
+    :param confidence: Confidence level
+    :return: Mean, standard deviation and half-width
+    """
+    x = np.asarray(x, dtype=float)
+    if len(x) < 2:
+        return x.mean(), 0.0, np.inf
+    std = x.std(ddof=1)
+    hw = stats.t.ppf(0.5 + confidence / 2, len(x) - 1) * std / np.sqrt(len(x))
+    return x.mean(), std, hw
+
+
+def summarize(results, confidence=0.95):
+    """
+    Campaign statistics with confidence intervals
+    :param results: List of episode results
+    :param confidence: Confidence level
+    :return: Dictionary of statistics
+    """
+    summary = {"episodes": len(results)}
+    docked = sum(r["docked"] for r in results)
+    p, lo, hi = wilson_interval(docked, len(results), confidence)
+    summary["success"] = p
+    summary["success_ci"] = (lo, hi)
+    summary["success_hw"] = (hi - lo) / 2
+    for key in ["dv", "posfin", "velfin", "tof"]:
+        mean, std, hw = mean_interval([r[key] for r in results], confidence)
+        summary[key + "_mean"] = mean
+        summary[key + "_std"] = std
+        summary[key + "_hw"] = hw
+
+    return summary
+
+
+def failure_probability(results, outcomes=("collided", "lost"), confidence=0.95):
+    """
+    Importance-sampling estimate of the probability of failure outcomes
+    (OSS: unweighted Monte Carlo when all the weights are one)
+    :param results: List of episode results
+    :param outcomes: Episode outcomes counted as failures
+    :param confidence: Confidence level
+    :return: Dictionary with estimate, half-width and effective sample size
+    """
+    weight = np.array([r["weight"] for r in results])
+    failed = np.array([r["outcome"] in outcomes for r in results])
+    y = weight * failed
+    n = len(y)
+    p = y.mean()
+    std = y.std(ddof=1) if n > 1 else np.inf
+    hw = stats.norm.ppf(0.5 + confidence / 2) * std / np.sqrt(n)
+
+    return {
+        "probability": p,
+        "hw": hw,
+        "ci": (max(p - hw, 0.0), p + hw),
+        "relative_error": std / (np.sqrt(n) * p) if p > 0 else np.inf,
+        "ess": weight.sum() ** 2 / np.sum(weight**2),
+        "failures": int(failed.sum()),
+        "episodes": n,
+    }
+
+
+def summarize_strata(strata, weights, confidence=0.95):
+    """
+    Stratified estimates: per-stratum statistics and their weighted combination
+    (OSS: every stratum needs at least 2 episodes for its variance)
+    :param strata: Dictionary of episode results per stratum
+    :param weights: Dictionary of stratum probabilities
+    :param confidence: Confidence level
+    :return: Dictionary of statistics, per-stratum ones in "strata"
+    """
+    small = [h for h, results in strata.items() if len(results) < 2]
+    if small:
+        raise ValueError("Strata with less than 2 episodes: %s" % small)
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    total = sum(weights.values())
+    w = {h: weights[h] / total for h in strata}
+    per_stratum = {h: summarize(results, confidence) for h, results in strata.items()}
+    summary = {"episodes": sum(len(results) for results in strata.values())}
+
+    # Success probability (OSS: Wilson-adjusted proportions, so that the
+    # variance of a stratum with all successes or failures is not zero)
+    p = sum(w[h] * per_stratum[h]["success"] for h in strata)
+    center, var = 0.0, 0.0
+    for h in strata:
+        n_h = len(strata[h])
+        p_h = (per_stratum[h]["success"] * n_h + z**2 / 2) / (n_h + z**2)
+        center += w[h] * p_h
+        var += w[h] ** 2 * p_h * (1 - p_h) / (n_h + z**2)
+    summary["success"] = p
+    summary["success_hw"] = z * np.sqrt(var)
+    summary["success_ci"] = (
+        max(center - summary["success_hw"], 0.0),
+        min(center + summary["success_hw"], 1.0),
+    )
+
+    # Means
+    for key in ["dv", "posfin", "velfin", "tof"]:
+        summary[key + "_mean"] = sum(w[h] * per_stratum[h][key + "_mean"] for h in strata)
+        var = sum(
+            w[h] ** 2 * per_stratum[h][key + "_std"] ** 2 / len(strata[h]) for h in strata
+        )
+        summary[key + "_hw"] = z * np.sqrt(var)
+    summary["strata"] = per_stratum
+
+    return summary
+
+
+class ResultStore:
+    """
+    Append-only store of episode results (JSON lines) with the seed schedule of
+    the campaign in a side file. Every finished episode is appended and synced
+    to disk, so an interrupted campaign can be resumed.
+
+    :param path: JSON lines file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.schedule_path = path + ".seeds.json"
+
+    def load(self):
+        """
+        Completed episodes (OSS: a truncated last line is removed from the file)
+        :return: Dictionary index: result
+        """
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, "rb+") as file:
+            data = file.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                file.truncate(end)  # OSS: appends must start on a new line
+        for line in data[:end].decode().splitlines():
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            result["xfin"] = np.array(result["xfin"])
+            if "x0" in result:
+                result["x0"] = np.array(result["x0"])
+            results[result["index"]] = result
+        return results
+
+    def append(self, result):
+        record = {
+            key: value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value
+            for key, value in result.items()
+            if key not in ("obs", "ocp_solutions")  # OSS: trajectories are not stored
+        }
+        with open(self.path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def write_schedule(self, seed, tasks, identity=None):
+        """
+        Record campaign seed, identity and episode seeds, checking previous runs
+        :param seed: Seed of the campaign
+        :param tasks: Tasks of the current run
+        :param identity: Description of policy, environment and sampler (see describe)
+        """
+        identity = json.loads(json.dumps(identity))  # OSS: as read back from the file
+        schedule = {"seed": seed, "identity": identity, "episodes": {}}
+        if os.path.exists(self.schedule_path):
+            with open(self.schedule_path) as file:
+                schedule = json.load(file)
+            if schedule["seed"] != seed:
+                raise ValueError(
+                    "%s was created with seed %d, not %d"
+                    % (self.path, schedule["seed"], seed)
+                )
+            schedule.setdefault("identity", identity)  # OSS: files of older runs
+            if schedule["identity"] != identity:
+                raise ValueError(
+                    "%s was created with another policy, environment or sampler:\n%s"
+                    % (self.path, json.dumps(schedule["identity"]))
+                )
+        for task in tasks:
+            schedule["episodes"][str(task["index"])] = task["seed"]
+        with open(self.schedule_path + ".tmp", "w") as file:
+            json.dump(schedule, file)
+        os.replace(self.schedule_path + ".tmp", self.schedule_path)  # OSS: atomic
+
+
+class MonteCarloEngine:
+    """
+    Closed-loop Monte Carlo campaigns over a pool of workers.
+
+    :param env_fn: Picklable callable returning the environment, or dictionary of
+        them to compare several dynamics models
+    :param policy_fn: Picklable callable returning the policy, or dictionary of
+        them to compare several controllers
+    :param n_workers: Number of processes, 1 runs in the calling process
+    :param seed: Seed of the campaign
+    :param record: True to keep the observations of every episode
+    :param sampler: Initial-condition sampler, None for plain random sampling
+    :param store: JSON lines file of a resumable campaign, None to keep results in memory
+    """
+
+    def __init__(
+        self,
+        env_fn,
+        policy_fn,
+        n_workers=1,
+        seed=0,
+        record=False,
+        sampler=None,
+        store=None,
+    ):
+        self.env_fn = env_fn
+        self.policy_fn = policy_fn
+        self.n_workers = n_workers
+        self.seed = seed
+        self.record = record
+        self.sampler = sampler
+        self.store = None if store is None else ResultStore(store)
+        self.parameters = None  # OSS: (version, path) of set_parameters
+        self._pool = None
+        self._env = None
+        self._model = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # OSS: the next campaign re-creates environments and policies
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._env = None
+        self._model = None
+
+    def imap(self, func, tasks, ordered=True):
+        """
+        Run tasks on the workers, yielding results as they are available
+        :param func: Top-level function of a task dictionary
+        :param tasks: List of task dictionaries
+        :param ordered: True to yield results in the same order of the tasks
+        :return: Iterator of results
+        """
+        if self.n_workers <= 1:
+            global _env, _model, _env_fn, _parameters
+            if self._env is None:
+                self._env = _build(self.env_fn)
+                self._model = _build(self.policy_fn)
+                _parameters = None
+                _batch_envs.clear()
+            _env, _model, _env_fn = self._env, self._model, self.env_fn
+            return (func(task) for task in tasks)
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.n_workers,
+                initializer=_init_worker,
+                initargs=(self.env_fn, self.policy_fn),
+            )
+        if ordered:
+            return self._pool.imap(func, tasks, chunksize=1)
+        return self._pool.imap_unordered(func, tasks, chunksize=1)
+
+    def map(self, func, tasks):
+        """
+        Run tasks on the workers, results in the same order of the tasks
+        :param func: Top-level function of a task dictionary
+        :param tasks: List of task dictionaries
+        :return: List of results
+        """
+        return list(self.imap(func, tasks))
+
+    def set_parameters(self, path):
+        """
+        New parameters of the SB3 policy, loaded by every worker in its live
+        model before its next episode (OSS: the pool and the environments are
+        kept, no process is spawned)
+        :param path: Saved SB3 model
+        """
+        version = 0 if self.parameters is None else self.parameters[0] + 1
+        self.parameters = (version, path)
+
+    def tasks(self, indices, sampler=None):
+        sampler = self.sampler if sampler is None else sampler
+        tasks = [
+            {
+                "index": i,
+                "seed": episode_seed(self.seed, i),
+                "record": self.record,
+                "sampler": sampler,
+            }
+            for i in indices
+        ]
+        if self.parameters is not None:
+            for task in tasks:
+                task["parameters"] = self.parameters
+        return tasks
+
+    def failure_modes(self):
+        env = self._env if self._env is not None else _build(self.env_fn)
+        if isinstance(env, dict):
+            env = next(iter(env.values()))
+        return list(env.failure_modes)
+
+    def run_stratified(self, allocation, weights=None, confidence=0.95):
+        """
+        Campaign stratified over the thrust failure modes with a fixed
+        allocation (OSS: independent seeds in every stratum, as needed by the
+        variance of summarize_strata)
+        :param allocation: Episodes per mode (at least 2), integer or dictionary
+            mode: episodes
+        :param weights: Dictionary of mode probabilities, uniform if None
+        :param confidence: Confidence level
+        :return: Dictionary of episode results per mode and statistics
+        """
+        modes = self.failure_modes()
+        if not isinstance(allocation, dict):
+            allocation = {mode: allocation for mode in modes}
+        if min(allocation[mode] for mode in modes) < 2:
+            raise ValueError("Allocate at least 2 episodes per mode: %s" % allocation)
+        if weights is None:
+            weights = {mode: 1 for mode in modes}  # OSS: as random.choice in reset
+
+        tasks = []
+        start = 0
+        for mode in modes:
+            for task in self.tasks(range(start, start + allocation[mode])):
+                task["failure_mode"] = mode
+                tasks.append(task)
+            start += allocation[mode]
+        results = self.map(_run_task, tasks)
+        strata = {mode: [r for r in results if r["failure"] == mode] for mode in modes}
+
+        return strata, summarize_strata(strata, weights, confidence)
+
+    def run(self, n_episodes, start=0):
+        """
+        Fixed-size campaign. With a store, completed episodes are loaded and
+        only the missing ones are run, so interrupted or smaller campaigns
+        are resumed and extended
+        :param n_episodes: Number of episodes
+        :param start: Index of the first episode
+        :return: List of episode results
+        """
+        tasks = self.tasks(range(start, start + n_episodes))
+        if self.store is None:
+            return self.map(_run_task, tasks)
+
+        # Resume from the store
+        identity = {
+            "policy": describe(self.policy_fn),
+            "env": describe(self.env_fn),
+            "sampler": describe(self.sampler),
+        }
+        self.store.write_schedule(self.seed, tasks, identity)
+        results = self.store.load()
+        tasks = [task for task in tasks if task["index"] not in results]
+        print("Episodes completed %d, to run %d" % (n_episodes - len(tasks), len(tasks)))
+        for result in self.imap(_run_task, tasks, ordered=False):
+            self.store.append(result)
+            results[result["index"]] = result
+
+        return [results[i] for i in range(start, start + n_episodes)]
+
+    def run_paired(self, n_episodes, start=0):
+        """
+        Every policy and dynamics model of the dictionaries on the same
+        episodes: same seeds, hence same initial conditions, failure modes and
+        dynamics noise
+        :param n_episodes: Number of episodes
+        :param start: Index of the first episode
+        :return: Dictionary of episode results, ordered by index, per policy,
+            per dynamics model or per (policy, dynamics model)
+        """
+        policies = list(self.policy_fn) if isinstance(self.policy_fn, dict) else [None]
+        models = list(self.env_fn) if isinstance(self.env_fn, dict) else [None]
+
+        def label(policy, dynamics):
+            if dynamics is None:
+                return policy
+            return dynamics if policy is None else (policy, dynamics)
+
+        tasks = []
+        for task in self.tasks(range(start, start + n_episodes)):
+            for policy in policies:
+                for dynamics in models:
+                    tasks.append(dict(task, policy=policy, dynamics=dynamics))
+        results = self.map(_run_task, tasks)
+        paired = {label(p, d): [] for p in policies for d in models}
+        for task, result in zip(tasks, results):
+            paired[label(task["policy"], task["dynamics"])].append(result)
+
+        return paired
+
+    def run_batch(self, n_episodes, start=0, batch_size=32, policy=None, dynamics=None):
+        """
+        Fixed-size campaign in lockstep batches, one batched predict per step
+        and batch (OSS: same results of run, for policies that accept batched
+        observations)
+        :param n_episodes: Number of episodes
+        :param start: Index of the first episode
+        :param batch_size: Episodes per batch, one batch per worker task
+        :param policy: Name of the policy, if policy_fn is a dictionary
+        :param dynamics: Name of the dynamics model, if env_fn is a dictionary
+        :return: List of episode results
+        """
+        tasks = self.tasks(range(start, start + n_episodes))
+        batches = [
+            {"episodes": tasks[i : i + batch_size], "policy": policy, "dynamics": dynamics}
+            for i in range(0, len(tasks), batch_size)
+        ]
+        return [result for batch in self.map(_run_batch_task, batches) for result in batch]
+
+    def run_adaptive(
+        self,
+        hw_success=None,
+        hw_dv=None,
+        hw_posfin=None,
+        hw_velfin=None,
+        batch_size=50,
+        min_episodes=50,
+        max_episodes=500,
+        confidence=0.95,
+    ):
+        """
+        Sequential campaign, stopped when every requested confidence interval
+        half-width is reached or the budget is over
+        :param hw_success: Half-width on success probability [-]
+        :param hw_dv: Half-width on mean DV [m/s]
+        :param hw_posfin: Half-width on mean final position error [m]
+        :param hw_velfin: Half-width on mean final velocity error [m/s]
+        :param batch_size: Number of episodes per batch
+        :param min_episodes: Minimum number of episodes
+        :param max_episodes: Maximum number of episodes
+        :param confidence: Confidence level
+        :return: List of episode results and final statistics
+        """
+        targets = {
+            "success_hw": hw_success,
+            "dv_hw": hw_dv,
+            "posfin_hw": hw_posfin,
+            "velfin_hw": hw_velfin,
+        }
+        results = []
+        converged = False
+        while len(results) < max_episodes:
+            n_batch = min(batch_size, max_episodes - len(results))
+            results += self.run(n_batch, start=len(results))
+            summary = summarize(results, confidence)
+            print(
+                "Episodes %d, S_r %.1f %% +- %.1f %%, DV %.3f +- %.3f m/s"
+                % (
+                    len(results),
+                    summary["success"] * 100,
+                    summary["success_hw"] * 100,
+                    summary["dv_mean"],
+                    summary["dv_hw"],
+                )
+            )
+            converged = all(
+                summary[key] <= hw for key, hw in targets.items() if hw is not None
+            )
+            if len(results) >= min_episodes and converged:
+                break
+        summary["converged"] = converged
+
+        return results, summary
@@ -0,0 +1,28 @@
+# Import libraries
+from functools import partial
+from MonteCarloEngine import MonteCarloEngine
+from PolynomialChaos import fit_surrogate
+from Scenario import make_env, make_env_pert, load_model, x0ivp_std_vec
+
+# Dispersed components
+labels = ["dx", "dy", "dz", "dvx", "dvy", "dvz", "m"]
+
+# SURROGATES for CRTBP and BRFBP + SRP dynamics
+if __name__ == "__main__":
+    for name, env_fn in [("CRTBP", make_env), ("BRFBP + SRP", make_env_pert)]:
+        with MonteCarloEngine(
+            env_fn,
+            partial(load_model, "ppo_recurrentBest1B", True),
+            n_workers=8,
+            seed=0,
+        ) as engine:
+            surrogate = fit_surrogate(engine, x0ivp_std_vec, degree=2)
+
+        # Print Info
+        for key, pce in surrogate["surrogates"].items():
+            print(
+                "%s, %s: mean %.4f, standard deviation %.4f"
+                % (name, key, pce.mean(), pce.variance() ** 0.5)
+            )
+            for label, s1, st in zip(labels, pce.sobol_first(), pce.sobol_total()):
+                print("    %s: S1 %.3f, ST %.3f" % (label, s1, st))
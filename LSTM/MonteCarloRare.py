@@ -0,0 +1,41 @@
+# Import libraries
+from functools import partial
+import numpy as np
+from MonteCarloEngine import MonteCarloEngine, failure_probability
+from Sampling import ImportanceSampler
+from Scenario import make_env, load_model
+
+# TESTING with importance sampling MCM
+if __name__ == "__main__":
+    # Biased dispersion towards the corridor boundary (OSS: in standard deviations)
+    shift = np.zeros(16)
+    shift[6], shift[8] = 2, 2  # Lateral position
+    shift[9], shift[11] = 2, 2  # Lateral velocity
+    sampler = ImportanceSampler(shift=shift, scale=1.5, seed=0)
+
+    # Campaign
+    with MonteCarloEngine(
+        make_env,
+        partial(load_model, "ppo_recurrentBest1B", True),
+        n_workers=8,
+        seed=0,
+        sampler=sampler,
+    ) as engine:
+        results = engine.run(200)
+
+    # Print Info
+    for outcomes in [("collided",), ("lost",), ("collided", "lost")]:
+        estimate = failure_probability(results, outcomes=outcomes)
+        print(
+            "P(%s): %.3e, 95%% CI [%.3e, %.3e], relative error %.2f, "
+            "%d failures, ESS %.1f"
+            % (
+                " or ".join(outcomes),
+                estimate["probability"],
+                estimate["ci"][0],
+                estimate["ci"][1],
+                estimate["relative_error"],
+                estimate["failures"],
+                estimate["ess"],
+            )
+        )
@@ -0,0 +1,42 @@
+# Import libraries
+from functools import partial
+import numpy as np
+from MonteCarloEngine import MonteCarloEngine
+from Scenario import make_env, make_env_params, load_model
+from Sensitivity import sensitivity
+
+# Parameter ranges
+bounds = {
+    "rho_max": (60, 90),
+    "rhodot_max": (4, 8),
+    "ang_corr": (np.deg2rad(15), np.deg2rad(25)),
+    "safety_radius": (0.5, 1.5),
+    "safety_vel": (0.05, 0.15),
+    "mass_std": (0.001, 0.01),
+    "failure": (0.3, 0.7),
+}
+
+# SENSITIVITY ANALYSIS
+if __name__ == "__main__":
+    with MonteCarloEngine(
+        make_env,
+        partial(load_model, "ppo_recurrentBest1B", True),
+        n_workers=8,
+        seed=0,
+    ) as engine:
+        indices = sensitivity(
+            engine,
+            make_env_params,
+            bounds,
+            n_base=32,
+            n_episodes=20,
+            cache_path="sensitivity_cache.pkl",
+        )
+
+    # Print Info
+    for key in ["success", "dv"]:
+        print(key)
+        for name, s1, st in zip(
+            indices["names"], indices[key + "_S1"], indices[key + "_ST"]
+        ):
+            print("    %s: S1 %.3f, ST %.3f" % (name, s1, st))
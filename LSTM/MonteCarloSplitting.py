@@ -0,0 +1,34 @@
+# Import libraries
+from functools import partial
+from MonteCarloEngine import MonteCarloEngine
+from Scenario import make_env, load_model
+from Splitting import multilevel_splitting
+
+
+def make_env_noisy():
+    # OSS: branches differ only by the dynamics noise after a split
+    env = make_env()
+    env.dyn_uncertainty = 1e-6  # OSS: in m/s^2
+    return env
+
+
+# TESTING with multilevel splitting
+if __name__ == "__main__":
+    with MonteCarloEngine(
+        make_env_noisy,
+        partial(load_model, "ppo_recurrentBest1B", True),
+        n_workers=8,
+        seed=0,
+    ) as engine:
+        estimate = multilevel_splitting(engine, n_particles=100, p0=0.1)
+
+    # Print Info
+    print(
+        "P(collided or lost): %.3e, relative error %.2f, %d levels, %d branches"
+        % (
+            estimate["probability"],
+            estimate["relative_error"],
+            len(estimate["thresholds"]),
+            estimate["branches"],
+        )
+    )
@@ -0,0 +1,40 @@
+# Import libraries
+from functools import partial
+from MonteCarloEngine import MonteCarloEngine
+from Scenario import make_env, load_model
+
+# Thrust failure modes
+labels = {1: "50% T_x", 2: "50% T_y", 3: "50% T_z", 4: "Nominal"}
+
+# TESTING with MCM stratified over failure modes
+if __name__ == "__main__":
+    with MonteCarloEngine(
+        make_env,
+        partial(load_model, "ppo_recurrentBest1B", True),
+        n_workers=8,
+        seed=0,
+    ) as engine:
+        strata, summary = engine.run_stratified(allocation=60)
+
+    # Print Info
+    for mode, stats in summary["strata"].items():
+        print(
+            "%s: S_r %.1f %% [%.1f %%, %.1f %%], DV %.3f +- %.3f m/s"
+            % (
+                labels.get(mode, mode),
+                stats["success"] * 100,
+                stats["success_ci"][0] * 100,
+                stats["success_ci"][1] * 100,
+                stats["dv_mean"],
+                stats["dv_hw"],
+            )
+        )
+    print(
+        "Overall: S_r %.1f %% +- %.1f %%, DV %.3f +- %.3f m/s"
+        % (
+            summary["success"] * 100,
+            summary["success_hw"] * 100,
+            summary["dv_mean"],
+            summary["dv_hw"],
+        )
+    )
@@ -0,0 +1,147 @@
+# Import libraries
+import itertools
+import math
+import numpy as np
+from numpy.polynomial.hermite_e import hermeval
+from scipy.stats import norm, qmc
+from MonteCarloEngine import _run_task
+from Sampling import FixedSampler
+
+
+class PolynomialChaos:
+    """
+    Non-intrusive polynomial chaos expansion on independent standard normal
+    inputs (probabilists' Hermite polynomials, total-degree basis), fitted by
+    least squares.
+
+    :param n_inputs: Number of inputs
+    :param degree: Maximum total degree
+    """
+
+    def __init__(self, n_inputs, degree=2):
+        self.n_inputs = n_inputs
+        self.degree = degree
+        self.multi_indices = np.array(
+            [
+                alpha
+                for alpha in itertools.product(range(degree + 1), repeat=n_inputs)
+                if sum(alpha) <= degree
+            ]
+        )
+        self.multi_indices = self.multi_indices[
+            np.argsort(self.multi_indices.sum(axis=1), kind="stable")
+        ]
+        self.norms = np.array(
+            [np.prod([math.factorial(a) for a in alpha]) for alpha in self.multi_indices]
+        )
+        self.coeffs = None
+
+    def basis(self, xi):
+        """
+        Basis evaluated at the inputs
+        :param xi: Standard normal inputs, n x n_inputs
+        :return: Design matrix, n x n_terms
+        """
+        xi = np.atleast_2d(xi)
+        psi = np.ones((len(xi), len(self.multi_indices)))
+        for k, alpha in enumerate(self.multi_indices):
+            for i, a in enumerate(alpha):
+                if a > 0:
+                    psi[:, k] *= hermeval(xi[:, i], np.eye(a + 1)[a])
+        return psi
+
+    def fit(self, xi, y):
+        self.coeffs, *_ = np.linalg.lstsq(self.basis(xi), y, rcond=None)
+        return self
+
+    def predict(self, xi):
+        return self.basis(xi) @ self.coeffs
+
+    def mean(self):
+        return self.coeffs[0]
+
+    def variance(self):
+        return np.sum(self.coeffs[1:] ** 2 * self.norms[1:])
+
+    def sobol_first(self):
+        """
+        First-order Sobol indices from the coefficients
+        :return: Indices, n_inputs
+        """
+        var = self.coeffs**2 * self.norms
+        only = [
+            (self.multi_indices[:, i] > 0)
+            & (self.multi_indices.sum(axis=1) == self.multi_indices[:, i])
+            for i in range(self.n_inputs)
+        ]
+        return np.array([var[mask].sum() for mask in only]) / self.variance()
+
+    def sobol_total(self):
+        """
+        Total Sobol indices from the coefficients
+        :return: Indices, n_inputs
+        """
+        var = self.coeffs**2 * self.norms
+        return (
+            np.array(
+                [var[self.multi_indices[:, i] > 0].sum() for i in range(self.n_inputs)]
+            )
+            / self.variance()
+        )
+
+
+def fit_surrogate(
+    engine,
+    std,
+    degree=2,
+    n_samples=None,
+    outputs=("dv", "posfin", "velfin"),
+    failure_mode=4,
+    seed=0,
+):
+    """
+    Polynomial chaos surrogates of closed-loop outputs w.r.t. the initial
+    dispersion, from a Latin hypercube design run on the engine workers
+    :param engine: MonteCarloEngine (CRTBP or BRFBP + SRP environment)
+    :param std: Standard deviation of the initial state (e.g. x0ivp_std_vec)
+    :param degree: Maximum total degree
+    :param n_samples: Size of the design, twice the number of terms if None
+    :param outputs: Episode results to fit
+    :param failure_mode: Thrust failure mode of every episode
+    :param seed: Seed of the design
+    :return: Dictionary of surrogates per output, dispersed components, design
+    """
+    # Design of experiments on the dispersed components
+    std = np.asarray(std)[0:13]
+    dims = np.flatnonzero(std)
+    pce = PolynomialChaos(len(dims), degree)
+    if n_samples is None:
+        n_samples = 2 * len(pce.multi_indices)
+    u = qmc.LatinHypercube(len(dims), seed=seed).random(n_samples)
+    xi = norm.ppf(u)
+    deviations = np.zeros((n_samples, len(std)))
+    deviations[:, dims] = xi * std[dims]
+
+    # Closed-loop episodes
+    sampler = FixedSampler(deviations, [failure_mode] * n_samples)
+    results = engine.map(_run_task, engine.tasks(range(n_samples), sampler))
+
+    # Fit
+    surrogates = {}
+    for key in outputs:
+        y = np.array([r[key] for r in results], dtype=float)
+        surrogates[key] = PolynomialChaos(len(dims), degree).fit(xi, y)
+
+    return {"surrogates": surrogates, "dims": dims, "std": std, "xi": xi, "results": results}
+
+
+def what_if(surrogate, deviation):
+    """
+    Cheap query of a fitted surrogate
+    :param surrogate: Dictionary returned by fit_surrogate
+    :param deviation: Deviations from the mean initial state, n x 13
+    :return: Dictionary of predicted outputs
+    """
+    dims = surrogate["dims"]
+    xi = np.atleast_2d(deviation)[:, dims] / surrogate["std"][dims]
+    return {key: pce.predict(xi) for key, pce in surrogate["surrogates"].items()}
@@ -0,0 +1,202 @@
+# Import libraries
+import numpy as np
+from scipy.stats import norm, qmc
+
+
+class Sampler:
+    """
+    Initial-condition sampler: maps the point of an episode in the unit
+    hypercube to a dispersed initial state (Gaussian dispersion) and a thrust
+    failure mode. The last coordinate of the point selects the failure mode.
+
+    :param seed: Seed of the point set
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.index = 0
+        self.weight = 1.0  # OSS: likelihood ratio of the last sample
+        self._points = None
+
+    def unit_points(self, n, dim):
+        """
+        Point set in the unit hypercube, uniform random by default (OSS: larger
+        sets extend the smaller ones, same seed)
+        :param n: Minimum number of points
+        :param dim: Dimension
+        :return: Points, n x dim
+        """
+        return np.random.default_rng(self.seed).random((n, dim))
+
+    def point(self, index, dim):
+        if self._points is None or index >= len(self._points):
+            self._points = self.unit_points(index + 1, dim)
+        return self._points[index]
+
+    def sample(self, state0, state0_std, failure_modes):
+        """
+        Initial state and failure mode of the current episode
+        :param state0: Mean initial state
+        :param state0_std: Standard deviation of the initial state
+        :param failure_modes: List of thrust failure modes
+        :return: Initial state, failure mode
+        """
+        dims = np.flatnonzero(state0_std)
+        u = np.clip(self.point(self.index, len(dims) + 1), 1e-12, 1 - 1e-12)
+        self.index += 1
+
+        # Gaussian dispersion through the inverse CDF
+        state = np.array(state0, dtype=float)
+        state[dims] += state0_std[dims] * norm.ppf(u[:-1])
+        mode = failure_modes[int(u[-1] * len(failure_modes))]
+        self.weight = 1.0
+
+        return state, mode
+
+
+class RandomSampler(Sampler):
+    """
+    Independent uniform points, reproducible per episode index.
+    """
+
+    def point(self, index, dim):
+        return np.random.default_rng([self.seed, index]).random(dim)
+
+
+class FixedSampler(Sampler):
+    """
+    Given deviations from the mean initial state and failure modes, one per
+    episode (OSS: nominal trajectory, sigma points, designs of experiments).
+
+    :param deviations: Deviations from the mean initial state, n x (<= 16)
+    :param modes: Failure modes, n
+    """
+
+    def __init__(self, deviations, modes):
+        super(FixedSampler, self).__init__()
+        self.deviations = np.atleast_2d(deviations)
+        self.modes = list(modes)
+
+    def sample(self, state0, state0_std, failure_modes):
+        state = np.array(state0, dtype=float)
+        deviation = self.deviations[self.index]
+        state[: len(deviation)] += deviation
+        mode = self.modes[self.index]
+        self.index += 1
+        self.weight = 1.0
+
+        return state, mode
+
+
+class SobolSampler(Sampler):
+    """
+    Scrambled Sobol sequence, extendable to any number of episodes.
+    """
+
+    def unit_points(self, n, dim):
+        m = int(np.ceil(np.log2(max(n, 2))))
+        return qmc.Sobol(dim, scramble=True, seed=self.seed).random_base2(m)
+
+
+class LatinHypercubeSampler(Sampler):
+    """
+    Latin hypercube of a fixed number of episodes.
+
+    :param n_points: Number of episodes of the design
+    :param seed: Seed of the design
+    """
+
+    def __init__(self, n_points, seed=0):
+        super(LatinHypercubeSampler, self).__init__(seed)
+        self.n_points = n_points
+
+    def unit_points(self, n, dim):
+        if n > self.n_points:
+            raise ValueError(
+                "Latin hypercube of %d points, episode %d requested" % (self.n_points, n)
+            )
+        return qmc.LatinHypercube(dim, seed=self.seed).random(self.n_points)
+
+
+class StratifiedSampler(LatinHypercubeSampler):
+    """
+    Failure modes in equal strata (episode index modulo number of modes) and
+    Latin hypercube dispersions within every stratum.
+
+    :param n_points: Number of episodes of the design
+    :param seed: Seed of the design
+    :param n_modes: Number of failure modes
+    """
+
+    def __init__(self, n_points, seed=0, n_modes=4):
+        super(StratifiedSampler, self).__init__(n_points, seed)
+        self.n_modes = n_modes
+
+    def unit_points(self, n, dim):
+        if n > self.n_points:
+            raise ValueError(
+                "Stratified design of %d points, episode %d requested"
+                % (self.n_points, n)
+            )
+        points = np.zeros((self.n_points, dim))
+        for k in range(self.n_modes):
+            stratum = np.arange(k, self.n_points, self.n_modes)
+            lhs = qmc.LatinHypercube(dim - 1, seed=self.seed + k)
+            points[stratum, :-1] = lhs.random(len(stratum))
+            points[stratum, -1] = (k + 0.5) / self.n_modes
+
+        return points
+
+
+class ImportanceSampler(Sampler):
+    """
+    Biased dispersion for rare-event estimation: the Gaussian of every
+    dispersed component is shifted by shift * std and inflated by scale, and
+    failure modes are drawn with mode_probs. The likelihood ratio of the
+    nominal distribution over the biased one is kept in weight.
+
+    :param shift: Mean shift in standard deviations, same size of the state
+    :param scale: Standard deviation inflation, scalar or same size of the state
+    :param mode_probs: Biased probabilities of the failure modes, None if uniform
+    :param base: Sampler of the unit points, None for independent points
+    :param seed: Seed of the points
+    """
+
+    def __init__(self, shift=None, scale=1.0, mode_probs=None, base=None, seed=0):
+        super(ImportanceSampler, self).__init__(seed)
+        self.shift = shift
+        self.scale = scale
+        self.mode_probs = mode_probs
+        self.base = RandomSampler(seed) if base is None else base
+
+    def point(self, index, dim):
+        return self.base.point(index, dim)
+
+    def sample(self, state0, state0_std, failure_modes):
+        dims = np.flatnonzero(state0_std)
+        u = np.clip(self.point(self.index, len(dims) + 1), 1e-12, 1 - 1e-12)
+        self.index += 1
+
+        # Biased Gaussian dispersion
+        shift = np.zeros(len(state0)) if self.shift is None else np.asarray(self.shift)
+        scale = np.broadcast_to(self.scale, np.shape(state0))
+        z = shift[dims] + scale[dims] * norm.ppf(u[:-1])  # OSS: in nominal std units
+        state = np.array(state0, dtype=float)
+        state[dims] += state0_std[dims] * z
+        log_weight = np.sum(
+            norm.logpdf(z) - norm.logpdf(z, loc=shift[dims], scale=scale[dims])
+        )
+
+        # Biased failure modes
+        if self.mode_probs is None:
+            mode = failure_modes[int(u[-1] * len(failure_modes))]
+        else:
+            cdf = np.cumsum(self.mode_probs) / np.sum(self.mode_probs)
+            k = min(int(np.searchsorted(cdf, u[-1], side="right")), len(cdf) - 1)
+            mode = failure_modes[k]
+            log_weight += np.log(1 / len(failure_modes)) - np.log(
+                self.mode_probs[k] / np.sum(self.mode_probs)
+            )
+        self.weight = np.exp(log_weight)
+
+        return state, mode
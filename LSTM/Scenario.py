@@ -0,0 +1,127 @@
+# Import libraries
+import numpy as np
+from stable_baselines3 import PPO
+from sb3_contrib import RecurrentPPO
+
+# DEFINITIONS
+# Data and initialization (OSS: same scenario of MonteCarlo.py)
+m_star = 6.0458 * 1e24  # Kilograms
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+
+dt = 0.5
+ToF = 100
+
+rho_max = 70
+rhodot_max = 6
+
+ang_corr = np.deg2rad(20)
+safety_radius = 1
+safety_vel = 0.1
+
+max_thrust = 29620
+mass = 21000
+Isp = 300
+g0 = 9.81
+
+x0t_state = np.array(
+    [
+        1.02206694e00,
+        -1.32282592e-07,
+        -1.82100000e-01,
+        -1.69229909e-07,
+        -1.03353155e-01,
+        6.44013821e-07,
+    ]
+)  # 9:2 NRO - 50m after apolune, already corrected, rt = 399069639.7170633, vt = 105.88740083894766
+x0r_state = np.array(
+    [
+        1.08357767e-13,
+        1.32282592e-07,
+        -4.12142542e-13,
+        1.69229909e-07,
+        -3.65860120e-13,
+        -6.44013821e-07,
+    ]
+)
+x0r_mass = np.array([mass / m_star])
+x0_time_rem = np.array([ToF / t_star])
+x0ivp_vec = np.concatenate((x0t_state, x0r_state, x0r_mass, x0_time_rem))
+x0ivp_std_vec = np.absolute(
+    np.concatenate(
+        (
+            np.zeros(6),
+            5 * np.ones(3) / l_star,
+            0.1 * np.ones(3) / (l_star / t_star),
+            0.005 * x0r_mass,
+            np.zeros(1),
+        )
+    )
+)
+
+
+def make_env(**kwargs):
+    """
+    CRTBP environment of the scenario (OSS: top-level to be picklable by workers)
+    :param kwargs: Overrides of the environment arguments
+    :return: Environment
+    """
+    from Environment import ArpodCrtbp
+
+    return ArpodCrtbp(**dict(env_kwargs(), **kwargs))
+
+
+def make_env_pert(**kwargs):
+    """
+    BRFBP + SRP environment of the scenario
+    :param kwargs: Overrides of the environment arguments
+    :return: Environment
+    """
+    from EnvironmentPert import ArpodCrtbp
+
+    return ArpodCrtbp(**dict(env_kwargs(), **kwargs))
+
+
+def env_kwargs():
+    """
+    Environment arguments of the scenario
+    :return: Dictionary of arguments
+    """
+    return dict(
+        max_time=ToF,
+        dt=dt,
+        rho_max=rho_max,
+        rhodot_max=rhodot_max,
+        x0ivp=x0ivp_vec,
+        x0ivp_std=x0ivp_std_vec,
+        ang_corr=ang_corr,
+        safety_radius=safety_radius,
+        safety_vel=safety_vel,
+    )
+
+
+def load_model(path, recurrent):
+    """
+    Load a saved policy on CPU
+    :param path: Path of the saved SB3 model
+    :param recurrent: True for RecurrentPPO, False for PPO
+    :return: Loaded model
+    """
+    algo = RecurrentPPO if recurrent else PPO
+    return algo.load(path, device="cpu")
+
+
+def make_env_params(mass_std=0.005, failure=0.5, **kwargs):
+    """
+    CRTBP environment with modified scenario parameters
+    :param mass_std: Relative standard deviation of the initial mass
+    :param failure: Thrust fraction of the failed direction
+    :param kwargs: Overrides of the environment arguments (rho_max, ang_corr...)
+    :return: Environment
+    """
+    std = x0ivp_std_vec.copy()
+    std[12] = mass_std * x0r_mass[0]
+    env = make_env(**dict({"x0ivp_std": std}, **kwargs))
+    env.failure = failure  # OSS: applied at every reset
+
+    return env
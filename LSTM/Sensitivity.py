@@ -0,0 +1,167 @@
+# Import libraries
+import os
+import pickle
+import numpy as np
+from scipy.stats import qmc
+from MonteCarloEngine import describe, episode_seed, run_episode, worker_state
+
+# Worker environment of the last parameter point
+_point = {"key": None, "env": None}
+
+
+def point_key(params):
+    return tuple(sorted((name, round(float(value), 12)) for name, value in params.items()))
+
+
+def _run_point_episode(task):
+    # Re-build the environment only when the parameter point changes
+    key = point_key(task["params"])
+    if _point["key"] != key:
+        _point["env"] = task["env_fn"](**task["params"])
+        _point["key"] = key
+    _, model = worker_state()
+    return run_episode(_point["env"], model, index=task["index"], seed=task["seed"])
+
+
+class EpisodeCache:
+    """
+    Persistent episode results keyed by parameter point and episode seed, for
+    one campaign identity (policy, environment and seed namespace) stored in
+    the header of the file.
+
+    :param path: Pickle file, None to keep the cache in memory only
+    :param identity: Description of the campaign, checked against the file
+    """
+
+    def __init__(self, path=None, identity=None):
+        self.path = path
+        self.identity = identity
+        self.results = {}
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as file:
+                data = pickle.load(file)
+            if not isinstance(data, dict) or data.get("identity") != identity:
+                raise ValueError(
+                    "%s was created by another policy, environment or seed, "
+                    "or has no identity header" % path
+                )
+            self.results = data["results"]
+
+    def get(self, params, seed):
+        return self.results.get(point_key(params) + (("seed", seed),))
+
+    def put(self, params, seed, result):
+        self.results[point_key(params) + (("seed", seed),)] = result
+
+    def save(self):
+        if self.path is None:
+            return
+        with open(self.path + ".tmp", "wb") as file:
+            pickle.dump({"identity": self.identity, "results": self.results}, file)
+        os.replace(self.path + ".tmp", self.path)  # OSS: atomic
+
+
+def saltelli_design(bounds, n_base, seed=0):
+    """
+    Saltelli design: matrices A, B and A with the i-th column of B
+    :param bounds: Dictionary of parameter ranges (low, high)
+    :param n_base: Number of base samples
+    :param seed: Seed of the scrambled Sobol sequence
+    :return: Names, A (N x k), B (N x k), AB (k x N x k)
+    """
+    names = list(bounds)
+    k = len(names)
+    low = np.array([bounds[name][0] for name in names])
+    high = np.array([bounds[name][1] for name in names])
+    u = qmc.Sobol(2 * k, scramble=True, seed=seed).random(n_base)
+    A = low + (high - low) * u[:, :k]
+    B = low + (high - low) * u[:, k:]
+    AB = np.repeat(A[None], k, axis=0)
+    for i in range(k):
+        AB[i, :, i] = B[:, i]
+
+    return names, A, B, AB
+
+
+def sobol_indices(f_A, f_B, f_AB):
+    """
+    First-order (Saltelli 2010) and total (Jansen) Sobol indices
+    :param f_A: Outputs of A, N
+    :param f_B: Outputs of B, N
+    :param f_AB: Outputs of AB, k x N
+    :return: First-order and total indices, k
+    """
+    var = np.var(np.concatenate((f_A, f_B)))
+    if var == 0:
+        return np.zeros(len(f_AB)), np.zeros(len(f_AB))
+    S1 = np.mean(f_B * (f_AB - f_A), axis=1) / var
+    ST = 0.5 * np.mean((f_A - f_AB) ** 2, axis=1) / var
+    return S1, ST
+
+
+def evaluate_points(engine, env_fn, points, n_episodes, cache):
+    """
+    Success rate and mean DV of every parameter point, with common random
+    numbers across points and cached episodes re-used
+    :param engine: MonteCarloEngine holding the policy workers
+    :param env_fn: Picklable callable of the parameters returning the environment
+    :param points: List of parameter dictionaries
+    :param n_episodes: Number of episodes per point
+    :param cache: EpisodeCache
+    :return: Success rate and mean DV, one per point
+    """
+    seeds = [episode_seed(engine.seed, j) for j in range(n_episodes)]
+    tasks = []
+    for params in points:
+        for j, seed in enumerate(seeds):
+            if cache.get(params, seed) is None:
+                tasks.append(
+                    {"env_fn": env_fn, "params": params, "index": j, "seed": seed}
+                )
+                cache.put(params, seed, {})  # OSS: repeated points run once
+    print("Parameter points %d, new episodes %d" % (len(points), len(tasks)))
+    for task, result in zip(tasks, engine.map(_run_point_episode, tasks)):
+        cache.put(task["params"], task["seed"], result)
+    cache.save()
+
+    success = np.zeros(len(points))
+    dv = np.zeros(len(points))
+    for p, params in enumerate(points):
+        results = [cache.get(params, seed) for seed in seeds]
+        success[p] = np.mean([r["docked"] for r in results])
+        dv[p] = np.mean([r["dv"] for r in results])
+
+    return success, dv
+
+
+def sensitivity(engine, env_fn, bounds, n_base=64, n_episodes=20, cache_path=None):
+    """
+    Global sensitivity of success rate and DV to the scenario parameters
+    :param engine: MonteCarloEngine holding the policy workers
+    :param env_fn: Picklable callable of the parameters returning the environment
+    :param bounds: Dictionary of parameter ranges (low, high)
+    :param n_base: Number of base samples of the Saltelli design
+    :param n_episodes: Number of episodes per parameter point
+    :param cache_path: Pickle file of cached episodes
+    :return: Dictionary of first-order and total indices per output
+    """
+    names, A, B, AB = saltelli_design(bounds, n_base, seed=engine.seed)
+    k, N = len(names), n_base
+    rows = np.concatenate((A, B, AB.reshape(k * N, k)))
+    points = [dict(zip(names, row)) for row in rows]
+    identity = {
+        "policy": describe(engine.policy_fn),
+        "env": describe(env_fn),
+        "seed": engine.seed,
+    }
+    success, dv = evaluate_points(
+        engine, env_fn, points, n_episodes, EpisodeCache(cache_path, identity)
+    )
+
+    indices = {"names": names}
+    for key, f in [("success", success), ("dv", dv)]:
+        S1, ST = sobol_indices(f[:N], f[N : 2 * N], f[2 * N :].reshape(k, N))
+        indices[key + "_S1"] = S1
+        indices[key + "_ST"] = ST
+
+    return indices
@@ -0,0 +1,184 @@
+# Import libraries
+import copy
+import random
+import numpy as np
+from MonteCarloEngine import episode_seed, restore, snapshot, worker_state
+
+# DATA
+l_star = 3.844 * 1e8  # Meters
+
+
+def corridor_score(env, obs):
+    """
+    Importance function: opposite of the minimum margin between the approach
+    corridor and the keep-out sphere (OSS: same constraint of corridor_const)
+    :param env: Environment
+    :param obs: Un-scaled observation
+    :return: Score [m], positive when a constraint is violated
+    """
+    pos_vec = obs[6:9] * l_star
+    rho = np.linalg.norm(pos_vec)
+    len_cut = np.sqrt((env.safety_radius**2) / np.square(np.tan(env.ang_corr)))
+    const_signal = -(pos_vec[1] + len_cut) + rho * np.cos(env.ang_corr)
+    return max(const_signal, rho - env.rho_max)
+
+
+def _run_branch(task):
+    """
+    Propagate a branch, from reset or from a snapshot, until the episode ends
+    :param task: Dictionary with seed, index, start and threshold
+    :return: Dictionary with outcome, maximum score and crossing snapshots
+    """
+    env, model = worker_state()
+    random.seed(task["seed"])
+    np.random.seed(task["seed"])
+
+    # Initialization
+    start = task["start"]
+    if start is None:
+        env.sampler = task["sampler"]
+        if env.sampler is not None:
+            env.sampler.index = task["index"]
+        obs = env.reset()
+        lstm_states = None
+        done = True
+        max_score = -np.inf
+        records = []
+    else:
+        obs = restore(env, start["env"])
+        lstm_states = copy.deepcopy(start["lstm"])
+        done = False
+        max_score = start["score"]
+        records = [start]
+
+    # Propagation, saving the state at every new maximum of the score
+    while True:
+        action, lstm_states = model.predict(
+            obs, state=lstm_states, episode_start=np.array([done]), deterministic=True
+        )
+        obs, rewards, done, info = env.step(action)
+        score = task["score_fn"](env, env.scaler_reverse_observation(obs))
+        if done:
+            break
+        if score > max_score:
+            max_score = score
+            if score >= task["threshold"]:
+                records.append(
+                    {
+                        "score": score,
+                        "env": snapshot(env),
+                        "lstm": copy.deepcopy(lstm_states),
+                    }
+                )
+
+    # Failed branches rank above every surviving one
+    outcome = info.get("Episode success")
+    failed = outcome in task["failures"]
+    if failed:
+        max_score = max(max_score, score, 0.0)
+
+    return {
+        "outcome": outcome,
+        "failed": failed,
+        "max_score": max_score,
+        "records": records,
+    }
+
+
+def multilevel_splitting(
+    engine,
+    n_particles=100,
+    p0=0.1,
+    max_levels=10,
+    score_fn=corridor_score,
+    failures=("collided", "lost"),
+):
+    """
+    Adaptive multilevel splitting (subset simulation) estimate of a failure
+    probability. At every level the p0 fraction of branches with the highest
+    score sets the next threshold, and N new branches are re-simulated only
+    from the states where the survivors first crossed it. Branch diversity
+    comes from the dynamics noise of the environment (dyn_uncertainty).
+    :param engine: MonteCarloEngine holding environment and policy workers
+    :param n_particles: Number of branches per level
+    :param p0: Conditional probability of every level
+    :param max_levels: Maximum number of intermediate levels
+    :param score_fn: Importance function of environment and un-scaled observation
+    :param failures: Episode outcomes counted as failures
+    :return: Dictionary with estimate, relative error, thresholds and cost
+    """
+    # Level 0: plain Monte Carlo from the initial dispersion
+    tasks = [
+        {
+            "index": i,
+            "seed": episode_seed(engine.seed, i),
+            "start": None,
+            "sampler": engine.sampler,
+            "threshold": -np.inf,
+            "score_fn": score_fn,
+            "failures": failures,
+        }
+        for i in range(n_particles)
+    ]
+    branches = engine.map(_run_branch, tasks)
+    n_sim = n_particles
+    prob = 1.0
+    rel_var = 0.0
+    thresholds = []
+
+    for level in range(max_levels):
+        scores = np.array([b["max_score"] for b in branches])
+        p_fail = np.mean([b["failed"] for b in branches])
+        threshold = np.quantile(scores, 1 - p0)
+        if p_fail >= p0 or threshold >= 0:
+            break
+
+        # Survivors and their first crossing of the threshold (OSS: branches
+        # failed without crossing states are carried over as failed particles)
+        survivors = [b for b in branches if b["max_score"] >= threshold]
+        starts = [
+            next((r for r in b["records"] if r["score"] >= threshold), None)
+            for b in survivors
+        ]
+        p_level = len(survivors) / n_particles
+        prob *= p_level
+        rel_var += (1 - p_level) / (p_level * n_particles)
+        thresholds.append(threshold)
+        print(
+            "Level %d: threshold %.3f m, %d survivors, probability %.3e"
+            % (level + 1, threshold, len(survivors), prob)
+        )
+
+        # Re-simulation of N branches resampled from the survivors
+        rng = np.random.default_rng([engine.seed, level])
+        picks = rng.integers(len(survivors), size=n_particles)
+        tasks = [
+            {
+                "index": i,
+                "seed": episode_seed(engine.seed, (level + 1) * n_particles + i),
+                "start": starts[j],
+                "threshold": threshold,
+                "score_fn": score_fn,
+                "failures": failures,
+            }
+            for i, j in enumerate(picks)
+            if starts[j] is not None
+        ]
+        simulated = iter(engine.map(_run_branch, tasks))
+        branches = [
+            next(simulated) if starts[j] is not None else survivors[j] for j in picks
+        ]
+        n_sim += len(tasks)
+
+    # Final level
+    p_fail = np.mean([b["failed"] for b in branches])
+    prob *= p_fail
+    if p_fail > 0:
+        rel_var += (1 - p_fail) / (p_fail * n_particles)
+
+    return {
+        "probability": prob,
+        "relative_error": np.sqrt(rel_var) if p_fail > 0 else np.inf,
+        "thresholds": thresholds,
+        "branches": n_sim,
+    }
@@ -0,0 +1,82 @@
+# Import libraries
+import numpy as np
+
+# DATA
+l_star = 3.844 * 1e8  # Meters
+t_star = 375200  # Seconds
+
+
+def stack_episodes(obs_list):
+    """
+    Stack episodes of different length in a single campaign array
+    :param obs_list: List of un-scaled observations, each n_steps x 16
+    :return: Campaign array n_ep x max_steps x 16 padded with NaN, lengths n_ep
+    """
+    lengths = np.array([len(obs) for obs in obs_list])
+    campaign = np.full(
+        (len(obs_list), lengths.max(), np.shape(obs_list[0])[1]), np.nan
+    )
+    for i, obs in enumerate(obs_list):
+        campaign[i, : lengths[i]] = obs
+
+    return campaign, lengths
+
+
+def lyapunov(campaign, lengths, dt):
+    """
+    Lyapunov candidate V = 0.5 * (rho^2 + rhodot^2) and its time derivative for
+    a whole campaign at once (OSS: same conventions of MonteCarlo.py)
+    :param campaign: Un-scaled observations, n_ep x max_steps x 16 (NaN padded)
+    :param lengths: Number of valid observations per episode, n_ep
+    :param dt: Time-step [s]
+    :return: rho [m], rhodot [m/s], V, dVdT, all n_ep x (max_steps - 2)
+    """
+    # Drop initial observation and last step, as in the serial post-processing
+    position = campaign[:, 1:-1, 6:9] * l_star
+    velocity = campaign[:, 1:-1, 9:12] * l_star / t_star
+    rho = np.linalg.norm(position, axis=2)
+    rhodot = np.linalg.norm(velocity, axis=2)
+
+    # Mask samples beyond each episode end
+    n_valid = np.asarray(lengths) - 2
+    valid = np.arange(rho.shape[1])[None, :] < n_valid[:, None]
+    rho = np.where(valid, rho, np.nan)
+    rhodot = np.where(valid, rhodot, np.nan)
+
+    # V shifted w.r.t. its final value
+    V = 0.5 * (rho**2 + rhodot**2)
+    V_end = V[np.arange(len(V)), np.maximum(n_valid - 1, 0)]
+    V = V - V_end[:, None]
+
+    # Forward finite differences (OSS: last valid sample has no derivative)
+    dVdT = np.full(V.shape, np.nan)
+    dVdT[:, :-1] = np.diff(V, axis=1) / dt
+
+    return rho, rhodot, V, dVdT
+
+
+def violation_stats(dVdT, tol=0.0):
+    """
+    Statistics of Lyapunov decrease violations (dV/dt > tol)
+    :param dVdT: Time derivative of V, n_ep x n_steps (NaN padded)
+    :param tol: Tolerance on positive derivative
+    :return: Dictionary of per-episode and campaign metrics
+    """
+    valid = ~np.isnan(dVdT)
+    violated = np.where(valid, dVdT > tol, False)
+    n_steps = valid.sum(axis=1)
+    n_violated = violated.sum(axis=1)
+    frac_violated = n_violated / np.maximum(n_steps, 1)
+    first_violation = np.where(violated.any(axis=1), violated.argmax(axis=1), -1)
+    max_violation = np.max(np.where(violated, dVdT, 0), axis=1)
+
+    return {
+        "steps": n_steps,
+        "violations": n_violated,
+        "fraction": frac_violated,
+        "first": first_violation,
+        "max": max_violation,
+        "fraction_mean": frac_violated.mean(),
+        "fraction_std": frac_violated.std(),
+        "episodes_violated": (n_violated > 0).mean(),
+    }
@@ -0,0 +1,65 @@
+# Import libraries
+import numpy as np
+from MonteCarloEngine import _run_task
+from Sampling import FixedSampler
+
+
+def sigma_points(std, alpha=1.0, beta=2.0, kappa=0.0):
+    """
+    Scaled unscented transform of a diagonal Gaussian dispersion
+    :param std: Standard deviation of the initial state (OSS: zeros are skipped)
+    :param alpha: Spread of the sigma points
+    :param beta: Prior knowledge of the distribution, 2 for Gaussian
+    :param kappa: Secondary scaling
+    :return: Deviations 2n+1 x len(std), mean and covariance weights
+    """
+    dims = np.flatnonzero(std)
+    n = len(dims)
+    lam = alpha**2 * (n + kappa) - n
+    deviations = np.zeros((2 * n + 1, len(std)))
+    for k, i in enumerate(dims):
+        deviations[1 + k, i] = np.sqrt(n + lam) * std[i]
+        deviations[1 + n + k, i] = -np.sqrt(n + lam) * std[i]
+    w_mean = np.full(2 * n + 1, 1 / (2 * (n + lam)))
+    w_cov = w_mean.copy()
+    w_mean[0] = lam / (n + lam)
+    w_cov[0] = lam / (n + lam) + 1 - alpha**2 + beta
+
+    return deviations, w_mean, w_cov
+
+
+def unscented(engine, std, failure_mode=4, alpha=1.0, beta=2.0, kappa=0.0):
+    """
+    Mean and covariance of final relative state and DV from the 2n+1
+    sigma-point episodes, run on the Monte Carlo engine workers
+    :param engine: MonteCarloEngine
+    :param std: Standard deviation of the initial state (e.g. x0ivp_std_vec)
+    :param failure_mode: Thrust failure mode of every sigma point
+    :param alpha: Spread of the sigma points
+    :param beta: Prior knowledge of the distribution, 2 for Gaussian
+    :param kappa: Secondary scaling
+    :return: Dictionary of statistics
+    """
+    # Sigma-point episodes
+    deviations, w_mean, w_cov = sigma_points(
+        np.asarray(std)[0:13], alpha, beta, kappa
+    )
+    sampler = FixedSampler(deviations, [failure_mode] * len(deviations))
+    results = engine.map(_run_task, engine.tasks(range(len(deviations)), sampler))
+
+    # Weighted statistics of [x, y, z, vx, vy, vz, DV]
+    y = np.array([np.append(r["xfin"], r["dv"]) for r in results])
+    mean = w_mean @ y
+    cov = (w_cov[:, None] * (y - mean)).T @ (y - mean)
+
+    return {
+        "pos_mean": mean[0:3],
+        "vel_mean": mean[3:6],
+        "dv_mean": mean[6],
+        "pos_cov": cov[0:3, 0:3],
+        "vel_cov": cov[3:6, 3:6],
+        "dv_std": np.sqrt(max(cov[6, 6], 0)),
+        "cov": cov,
+        "docked": np.mean([r["docked"] for r in results]),
+        "results": results,
+    }
@@ -9,7 +9,15 @@ from stable_baselines3.common.callbacks import (
     StopTrainingOnRewardThreshold,
 )
 import matplotlib.pyplot as plt
-from CallBack import CallBack
+from CallBack import CallBack, UnscentedCallBack
+from MonteCarloEngine import MonteCarloEngine
+from Scenario import load_model
+from functools import partial
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ExtraCode"))
+from Residual import ResidualAction, make_baseline
 
 
 # FUNCTION lrsched()
@@ -46,6 +54,10 @@ max_thrust = 29620
 mass = 21000
 state_space = 16
 actions_space = 3
+residual = None  # OSS: None, "LQR" or "MPC" to learn a residual on that baseline
+residual_scale = 0.2
+unscented = False  # OSS: True to log the sigma-point robustness of the checkpoints
+unscented_workers = 8  # OSS: forked workers, the script has no __main__ guard
 
 x0t_state = np.array(
     [
@@ -83,7 +95,7 @@ x0ivp_std_vec = np.absolute(
 )
 
 # Define environment and model
-env = ArpodCrtbp(
+env_kwargs = dict(
     max_time=ToF,
     dt=dt,
     rho_max=rho_max,
@@ -94,6 +106,13 @@ env = ArpodCrtbp(
     safety_radius=safety_radius,
     safety_vel=safety_vel,
 )
+env = ArpodCrtbp(**env_kwargs)
+if residual is not None:
+    env = ResidualAction(env, make_baseline(env, residual), scale=residual_scale)
+    eval_env = ArpodCrtbp(**env_kwargs)  # OSS: not the training instance
+    eval_env = ResidualAction(
+        eval_env, make_baseline(eval_env, residual), scale=residual_scale
+    )
 check_env(env)
 model = RecurrentPPO(
     "MlpLstmPolicy",
@@ -117,14 +136,27 @@ print(model.policy)
 
 # Start learning
 eval_callback = EvalCallback(
-    env,
+    env if residual is None else eval_env,
     callback_on_new_best=StopTrainingOnRewardThreshold(
         reward_threshold=2.04, verbose=1
     ),
     verbose=1,  # TODO: prova questo o eval
 )
 call_back = CallBack(env)
-model.learn(total_timesteps=10000000, progress_bar=True, callback=call_back)
+callbacks = [call_back] if residual is None else [call_back, eval_callback]
+if unscented:
+    if residual is not None:
+        raise ValueError("The robustness read runs the policy without the baseline")
+    engine = MonteCarloEngine(
+        partial(ArpodCrtbp, **env_kwargs),
+        partial(load_model, "ppo_recurrent_unscented", True),
+        n_workers=unscented_workers,
+        seed=0,
+    )  # OSS: one pool for the whole training
+    callbacks.append(
+        UnscentedCallBack(engine, x0ivp_std_vec, "ppo_recurrent_unscented")
+    )
+model.learn(total_timesteps=10000000, progress_bar=True, callback=callbacks)
 
 # Evaluation and saving
 mean_reward, std_reward = evaluate_policy(model, env, n_eval_episodes=20, warn=False)
@@ -154,7 +186,8 @@ while True:
     obs, rewards, done, info = env.step(action)
 
     # Saving
-    actions_vec = np.vstack((actions_vec, env.scaler_reverse_action(action)))
+    applied = action if residual is None else env.last_action
+    actions_vec = np.vstack((actions_vec, env.scaler_reverse_action(applied)))
     obs_vec = np.vstack((obs_vec, env.scaler_reverse_observation(obs)))
     rewards_vec = np.append(rewards_vec, rewards)
 
@@ -0,0 +1,87 @@
+# Import libraries
+import os
+import numpy as np
+from sb3_contrib import RecurrentPPO
+from stable_baselines3 import PPO
+from stable_baselines3.common.evaluation import evaluate_policy
+from stable_baselines3.common.env_checker import check_env
+import matplotlib.pyplot as plt
+from CallBack import CallBack
+from Cloning import (
+    cached_solutions,
+    demonstrations,
+    load_dataset,
+    pretrain,
+    save_dataset,
+)
+from Scenario import ToF, dt, make_env
+
+# TRAINING
+# Data and initialization
+batch_size = 64
+recurrent = True  # OSS: RecurrentPPO actor, False for the PPO MLP one
+cache_path = "../ExtraCode/ocp_cache.pkl"  # OSS: solutions of OCPmcm.py
+dataset_path = "bc_dataset.npz"
+n_workers = 8
+
+if __name__ == "__main__":  # OSS: needed by the process pool
+    # Dataset of OCP demonstrations, built once
+    if not os.path.exists(dataset_path):
+        from OcpCache import OcpCache
+
+        sols = cached_solutions(OcpCache(cache_path))
+        print("Cached OCP solutions:", len(sols))
+        save_dataset(dataset_path, demonstrations(sols, make_env, n_workers))
+    dataset = load_dataset(dataset_path)
+    print("Demonstration pairs:", len(dataset["obs"]))
+
+    # Define environment and model (OSS: same scalers of the demonstrations)
+    env = make_env()
+    check_env(env)
+    model_kwargs = dict(
+        verbose=1,
+        batch_size=batch_size,
+        n_steps=int(batch_size * ToF / dt),
+        n_epochs=10,
+        learning_rate=0.00003,
+        gamma=0.99,
+        gae_lambda=1,
+        clip_range=0.1,
+        max_grad_norm=0.1,
+        ent_coef=1e-3,
+        tensorboard_log="./tensorboard/",
+    )
+    if recurrent:
+        model = RecurrentPPO(
+            "MlpLstmPolicy", env, policy_kwargs=dict(n_lstm_layers=2), **model_kwargs
+        )
+    else:
+        model = PPO(
+            "MlpPolicy",
+            env,
+            policy_kwargs=dict(
+                net_arch=dict(pi=[256, 256, 64, 64], vf=[256, 256, 64, 64])
+            ),
+            **model_kwargs
+        )
+
+    # Supervised pretraining of the actor
+    losses = pretrain(model, dataset, epochs=50)
+    mean_reward, std_reward = evaluate_policy(model, env, n_eval_episodes=20, warn=False)
+    print("Mean reward after behaviour cloning:", mean_reward)
+
+    # PPO fine-tuning
+    call_back = CallBack(env)
+    model.learn(total_timesteps=2000000, progress_bar=True, callback=call_back)
+    mean_reward, std_reward = evaluate_policy(model, env, n_eval_episodes=20, warn=False)
+    print("Mean reward after fine-tuning:", mean_reward)
+    model.save("ppo_recurrentBC" if recurrent else "ppo_mlpBC")
+
+    # Plot behaviour cloning loss
+    plt.figure()
+    plt.semilogy(np.arange(1, len(losses) + 1), losses, c="b", linewidth=2)
+    plt.grid(True)
+    plt.xlabel("Epoch [-]")
+    plt.ylabel("Behaviour cloning loss [-]")
+    plt.savefig("plots\BehaviourCloning.pdf")  # Save
+    plt.show()
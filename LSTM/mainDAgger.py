@@ -0,0 +1,54 @@
+# Import libraries
+import os
+from functools import partial
+import numpy as np
+import matplotlib.pyplot as plt
+from Cloning import load_dataset, save_dataset
+from Compare import make_mpc, make_ocp
+from Dagger import dagger
+from Scenario import load_model
+
+# TRAINING
+# Data and initialization
+expert = "MPC"  # OSS: "MPC" or "OCP"
+recurrent = True
+model_path = "ppo_recurrentBC"  # OSS: behaviour-cloned policy of mainBC.py
+dataset_path = "bc_dataset.npz"
+cache_path = "../ExtraCode/ocp_cache.pkl"
+n_workers = 8
+
+if __name__ == "__main__":  # OSS: needed by the process pool
+    cache = None
+    if expert == "MPC":
+        expert_fn = partial(make_mpc, horizon=20, k=1)
+    else:
+        from OcpCache import OcpCache
+
+        expert_fn = partial(make_ocp, cache_path=cache_path)
+        cache = OcpCache(cache_path)  # OSS: solutions of the workers are saved here
+    dataset = load_dataset(dataset_path) if os.path.exists(dataset_path) else None
+
+    # Interactive imitation
+    model = load_model(model_path, recurrent)
+    dataset, history = dagger(
+        model,
+        "ppo_recurrentDAgger" if recurrent else "ppo_mlpDAgger",
+        expert_fn,
+        dataset=dataset,
+        iterations=10,
+        n_episodes=32,
+        n_workers=n_workers,
+        recurrent=recurrent,
+        cache=cache,
+    )
+    save_dataset("dagger_dataset.npz", dataset)
+
+    # Plot success rate of the rollouts
+    iterations = np.array([h["iteration"] for h in history]) + 1
+    plt.figure()
+    plt.plot(iterations, [h["docked"] * 100 for h in history], c="b", linewidth=2)
+    plt.grid(True)
+    plt.xlabel("DAgger iteration [-]")
+    plt.ylabel("Docked [%]")
+    plt.savefig("plots\DAgger.pdf")  # Save
+    plt.show()
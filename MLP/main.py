@@ -4,8 +4,17 @@ from stable_baselines3 import PPO
 from stable_baselines3.common.evaluation import evaluate_policy
 from Environment import ArpodCrtbp
 from stable_baselines3.common.env_checker import check_env
+from stable_baselines3.common.callbacks import (
+    EvalCallback,
+    StopTrainingOnRewardThreshold,
+)
 import matplotlib.pyplot as plt
 from CallBack import CallBack
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ExtraCode"))
+from Residual import ResidualAction, make_baseline
 
 # TRAINING
 # Data and initialization
@@ -28,6 +37,8 @@ max_thrust = 29620
 mass = 21000
 state_space = 16
 actions_space = 3
+residual = None  # OSS: None, "LQR" or "MPC" to learn a residual on that baseline
+residual_scale = 0.2
 
 x0t_state = np.array(
     [
@@ -65,7 +76,7 @@ x0ivp_std_vec = np.absolute(
 )
 
 # Define environment and model
-env = ArpodCrtbp(
+env_kwargs = dict(
     max_time=ToF,
     dt=dt,
     rho_max=rho_max,
@@ -76,6 +87,13 @@ env = ArpodCrtbp(
     safety_radius=safety_radius,
     safety_vel=safety_vel
 )
+env = ArpodCrtbp(**env_kwargs)
+if residual is not None:
+    env = ResidualAction(env, make_baseline(env, residual), scale=residual_scale)
+    eval_env = ArpodCrtbp(**env_kwargs)  # OSS: not the training instance
+    eval_env = ResidualAction(
+        eval_env, make_baseline(eval_env, residual), scale=residual_scale
+    )
 check_env(env)
 model = PPO(
     "MlpPolicy",
@@ -98,7 +116,19 @@ print(model.policy)
 
 # Start learning
 call_back = CallBack(env)
-model.learn(total_timesteps=10000000, progress_bar=True, callback=call_back)
+callbacks = call_back
+if residual is not None:  # OSS: stop at the docking reward threshold
+    callbacks = [
+        call_back,
+        EvalCallback(
+            eval_env,
+            callback_on_new_best=StopTrainingOnRewardThreshold(
+                reward_threshold=2.04, verbose=1
+            ),
+            verbose=1,
+        ),
+    ]
+model.learn(total_timesteps=10000000, progress_bar=True, callback=callbacks)
 
 # Evaluation and saving
 mean_reward, std_reward = evaluate_policy(model, env, n_eval_episodes=20, warn=False)
@@ -124,7 +154,8 @@ while True:
     obs, rewards, done, info = env.step(action)
 
     # Saving
-    actions_vec = np.vstack((actions_vec, env.scaler_reverse_action(action)))
+    applied = action if residual is None else env.last_action
+    actions_vec = np.vstack((actions_vec, env.scaler_reverse_action(applied)))
     obs_vec = np.vstack((obs_vec, env.scaler_reverse_observation(obs)))
     rewards_vec = np.append(rewards_vec, rewards)
 